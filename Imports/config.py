@@ -24,6 +24,32 @@ class Config(BaseModel):
     backup: bool = False
     backup_folder: str = "~/Music/Backups"
     no_auth: bool = False
+    response_cache: bool = True
+    refresh: bool = False
+    album_id_index: bool = True
+    http_connect_timeout: float = 10.0
+    http_read_timeout: float = 60.0
+    http_pool_size: int = 8
+    vgmdb_max_concurrency: int = 4
+    vgmdb_requests_per_second: float = 5.0
+    prefetch_albums: int = 2
+    offline: bool = False
+    import_mirror: str | None = None
+    record_dir: str | None = None
+    replay_dir: str | None = None
+    replay_latency: float = 0.0
+    replay_error_rate: float = 0.0
+    scan_threads: int = 1
+    scan_listing_threads: int = 1
+    scan_cache: bool = True
+    verify_file_signatures: bool = False
+    light_scan: bool = False
+    split_mixed_folders: bool = False
+    scan_ignore_patterns: list[str] = ["Scans", "Logs"]
+    find_duplicates: bool = False
+    watch: bool = False
+    watch_debounce: float = 5.0
+    watch_polling: bool = False
 
     # Tagging:
     # Album specific flags
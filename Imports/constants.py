@@ -3,3 +3,8 @@ from typing import Literal
 
 LANGUAGES = Literal["english", "translated", "romaji", "japanese", "other"]
 THREAD_EXECUTOR_NUM_THREADS = 8
+
+HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+HTTP_READ_TIMEOUT_SECONDS = 60.0
+HTTP_POOL_CONNECTIONS = 10  # number of hosts whose connections are kept alive
+HTTP_POOL_MAXSIZE = THREAD_EXECUTOR_NUM_THREADS  # connections kept alive per host, scans are downloaded using THREAD_EXECUTOR_NUM_THREADS threads
@@ -0,0 +1,60 @@
+from Modules.Scan.models.album_identity import IDENTITY_KEYS, SPLIT_KEYS, AlbumMatchResult, TrackIdentity
+from Modules.Scan.models.track_tags import TrackTags
+from Modules.Utils.general_utils import cleanDate, is_date_in_YYYY_MM_DD
+
+"""
+for a folder to be considered as an album, every audio file must have one of the following common amongst them entirely:
+    * vgmdb link
+    * album name
+    * catalog number
+    * barcode
+    * date (only if full date is available in YYYY-MM-DD form)
+the identity of every track is extracted once, tracks with identical identities are grouped by hash,
+after which finding a common value is linear in the number of tracks
+"""
+
+
+def get_track_identity(tags: TrackTags) -> TrackIdentity:
+    date = cleanDate(tags.date) if tags.date else None
+    return TrackIdentity(
+        vgmdb_link=_unique(tags.vgmdb_link),
+        album=_unique(tags.album),
+        catalog=_unique(tags.catalog),
+        barcode=_unique(tags.barcode),
+        date=(date,) if date and is_date_in_YYYY_MM_DD(date) else (),
+    )
+
+
+def match_album_identity(track_tags: list[TrackTags]) -> AlbumMatchResult:
+    """the tags of every track of the folder, groups of the result refer to tracks by their index in track_tags"""
+    if not track_tags:
+        return AlbumMatchResult()
+
+    identities = [get_track_identity(tags) for tags in track_tags]
+    identity_counts: dict[TrackIdentity, int] = {}
+    for identity in identities:
+        identity_counts[identity] = identity_counts.get(identity, 0) + 1
+
+    total_tracks = len(track_tags)
+    for key_index, key in enumerate(IDENTITY_KEYS):
+        value_counts: dict[str, int] = {}
+        for identity, count in identity_counts.items():
+            for value in identity[key_index]:
+                value_counts[value] = value_counts.get(value, 0) + count
+        for value, count in value_counts.items():
+            if count == total_tracks:
+                return AlbumMatchResult(matched_key=key, matched_value=value)
+
+    # no common value, finding out how the tracks split using the first key present in every track
+    for key in SPLIT_KEYS:
+        key_index = IDENTITY_KEYS.index(key)
+        if all(identity[key_index] for identity in identity_counts):
+            groups: dict[str, list[int]] = {}
+            for track_index, identity in enumerate(identities):
+                groups.setdefault(identity[key_index][0], []).append(track_index)
+            return AlbumMatchResult(split_key=key, groups=groups)
+    return AlbumMatchResult()
+
+
+def _unique(values: list[str]) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(value for value in values if value))
@@ -0,0 +1,26 @@
+import os
+
+from Modules.Scan import constants
+from unigen import isFileFormatSupported
+
+"""
+cheap checks for rejecting non audio files (scans, logs, cue sheets, etc) before building an audio manager for them
+"""
+
+
+def has_supported_extension(file_name: str) -> bool:
+    return isFileFormatSupported(file_name)
+
+
+def has_audio_file_signature(file_path: str) -> bool:
+    """checks the first few bytes of the file against the known signature of its extension"""
+    _, extension = os.path.splitext(file_path)
+    signatures = constants.AUDIO_FILE_SIGNATURES.get(extension.lower())
+    if not signatures:
+        return True  # nothing to check against
+    try:
+        with open(file_path, "rb") as file:
+            header = file.read(constants.AUDIO_FILE_SIGNATURE_READ_SIZE)
+    except OSError:
+        return True  # let the audio manager report the actual error
+    return any(header[offset : offset + len(signature)] == signature for offset, signature in signatures)
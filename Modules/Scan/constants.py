@@ -1,2 +1,16 @@
 MAX_FOLDER_DEPTH_OF_ALBUM = 2
-DEFAULT_DISC_NUMBER = 1
\ No newline at end of file
+DEFAULT_DISC_NUMBER = 1
+SCAN_CACHE_FILE_NAME = "scan_cache.sqlite3"
+IGNORE_FILE_NAME = ".taggerignore"
+
+# leading bytes of supported audio files, (offset, signature), any one of them has to match
+AUDIO_FILE_SIGNATURES: dict[str, list[tuple[int, bytes]]] = {
+    ".flac": [(0, b"fLaC"), (0, b"ID3")],  # some taggers prepend an ID3 header to flac files
+    ".mp3": [(0, b"ID3"), (0, b"\xff\xfb"), (0, b"\xff\xf3"), (0, b"\xff\xf2"), (0, b"\xff\xfa")],
+    ".wav": [(0, b"RIFF")],
+    ".ogg": [(0, b"OggS")],
+    ".opus": [(0, b"OggS")],
+    ".m4a": [(4, b"ftyp")],
+}
+AUDIO_FILE_SIGNATURE_READ_SIZE = 12
+CONTENT_HASH_CHUNK_SIZE = 1024 * 1024
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import struct
+from typing import BinaryIO
+
+from Modules.Scan import constants
+
+"""
+content keys identify the audio of a file independently of its tags, without decoding anything:
+    * flac: md5 of the decoded audio, already stored by the encoder in STREAMINFO (the frames are hashed if the encoder did not set it)
+    * mp3: hash of everything between the ID3v2 header and the ID3v1/APEv2 footer
+    * m4a: hash of the mdat atoms (tags live in moov)
+    * ogg/opus: hash of the page bodies after the header pages (identification, comment and setup packets)
+    * wav: hash of the data chunk
+two files with the same content key contain the same audio stream, irrespective of their names and tags
+"""
+
+_ZERO_MD5 = bytes(16)
+_UNKNOWN_GRANULE_POSITION = 2**64 - 1
+
+
+def get_audio_content_key(file_path: str) -> str | None:
+    """returns None for unsupported formats, raises OSError if the file can not be read"""
+    _, extension = os.path.splitext(file_path)
+    extension = extension.lower()
+    with open(file_path, "rb") as file:
+        if extension == ".flac":
+            return _get_flac_content_key(file)
+        if extension == ".mp3":
+            return _get_mp3_content_key(file)
+        if extension == ".m4a":
+            return _get_m4a_content_key(file)
+        if extension in [".ogg", ".opus"]:
+            return _get_ogg_content_key(file, extension)
+        if extension == ".wav":
+            return _get_wav_content_key(file)
+    return None
+
+
+def _get_flac_content_key(file: BinaryIO) -> str | None:
+    file.seek(_get_id3v2_size(file))
+    if file.read(4) != b"fLaC":
+        return None
+    md5 = _ZERO_MD5
+    is_last_block = False
+    while not is_last_block:
+        block_header = file.read(4)
+        if len(block_header) < 4:
+            return None
+        is_last_block = bool(block_header[0] & 0x80)
+        block_type = block_header[0] & 0x7F
+        block_size = int.from_bytes(block_header[1:], "big")
+        if block_type == 0:  # STREAMINFO
+            md5 = file.read(block_size)[18:34]
+        else:
+            file.seek(block_size, os.SEEK_CUR)
+    if md5 != _ZERO_MD5:
+        return f"flac:{md5.hex()}"
+    return f"flac-frames:{_hash_range(file, file.tell(), None)}"
+
+
+def _get_mp3_content_key(file: BinaryIO) -> str:
+    start = _get_id3v2_size(file)
+    end = file.seek(0, os.SEEK_END)
+    if end - start >= 128:
+        file.seek(end - 128)
+        if file.read(3) == b"TAG":
+            end -= 128
+    if end - start >= 32:
+        file.seek(end - 32)
+        ape_footer = file.read(32)
+        if ape_footer[:8] == b"APETAGEX":
+            tag_size, _, flags = struct.unpack("<III", ape_footer[12:24])
+            end -= tag_size + (32 if flags & 0x80000000 else 0)  # tag_size includes the footer but not the optional header
+    return f"mp3:{_hash_range(file, start, max(start, end))}"
+
+
+def _get_m4a_content_key(file: BinaryIO) -> str | None:
+    file_size = file.seek(0, os.SEEK_END)
+    digest = hashlib.md5()
+    found_mdat = False
+    position = 0
+    while position + 8 <= file_size:
+        file.seek(position)
+        atom_size, atom_type = struct.unpack(">I4s", file.read(8))
+        header_size = 8
+        if atom_size == 1:
+            (atom_size,) = struct.unpack(">Q", file.read(8))
+            header_size = 16
+        elif atom_size == 0:
+            atom_size = file_size - position
+        if atom_size < header_size:
+            return None  # corrupt atom
+        if atom_type == b"mdat":
+            found_mdat = True
+            _update_digest(digest, file, position + header_size, position + atom_size)
+        position += atom_size
+    return f"m4a:{digest.hexdigest()}" if found_mdat else None
+
+
+def _get_ogg_content_key(file: BinaryIO, extension: str) -> str | None:
+    digest = hashlib.md5()
+    in_header_pages = True
+    while True:
+        page_header = file.read(27)
+        if len(page_header) < 27:
+            break
+        if page_header[:4] != b"OggS":
+            return None
+        (granule_position,) = struct.unpack("<Q", page_header[6:14])
+        segment_table = file.read(page_header[26])
+        body_size = sum(segment_table)
+        # header packets are on pages with granule position 0 (or unknown for pages which do not end a packet), audio starts on a fresh page
+        if in_header_pages and granule_position not in [0, _UNKNOWN_GRANULE_POSITION]:
+            in_header_pages = False
+        if in_header_pages:
+            file.seek(body_size, os.SEEK_CUR)
+        else:
+            digest.update(file.read(body_size))
+    return f"{extension[1:]}:{digest.hexdigest()}"
+
+
+def _get_wav_content_key(file: BinaryIO) -> str | None:
+    if file.read(12)[:4] != b"RIFF":
+        return None
+    while True:
+        chunk_header = file.read(8)
+        if len(chunk_header) < 8:
+            return None
+        chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+        if chunk_id == b"data":
+            start = file.tell()
+            return f"wav:{_hash_range(file, start, start + chunk_size)}"
+        file.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)  # chunks are word aligned
+
+
+def _get_id3v2_size(file: BinaryIO) -> int:
+    """size of the ID3v2 tag at the start of the file (0 if there is none), the file is left at its start"""
+    file.seek(0)
+    header = file.read(10)
+    file.seek(0)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]  # synchsafe integer
+    footer_size = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer_size
+
+
+def _hash_range(file: BinaryIO, start: int, end: int | None) -> str:
+    digest = hashlib.md5()
+    _update_digest(digest, file, start, end)
+    return digest.hexdigest()
+
+
+def _update_digest(digest: "hashlib._Hash", file: BinaryIO, start: int, end: int | None):
+    """end = None reads till the end of the file"""
+    file.seek(start)
+    remaining = None if end is None else end - start
+    while remaining is None or remaining > 0:
+        chunk = file.read(constants.CONTENT_HASH_CHUNK_SIZE if remaining is None else min(constants.CONTENT_HASH_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
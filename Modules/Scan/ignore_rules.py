@@ -0,0 +1,56 @@
+import os
+from fnmatch import fnmatch
+
+from Modules.Scan import constants
+from Modules.Utils.general_utils import get_default_logger
+
+"""
+rules for pruning directories (Scans, Logs, artwork, etc) from the walk, so that they are never listed.
+patterns are glob patterns (fnmatch), matched against:
+    * the directory name, if the pattern does not contain a "/" (e.g. "Scans", "*Artwork*")
+    * the path relative to the folder the rule belongs to, otherwise (e.g. "Series/Extras", "*/Bonus")
+patterns from the config belong to the scanned root folder,
+patterns from a .taggerignore file belong to the folder containing it and only apply within it (one pattern per line, # for comments)
+"""
+
+logger = get_default_logger(__name__, "info")
+
+
+class IgnoreRules:
+    def __init__(self, patterns: list[tuple[str, str]] | None = None):
+        self.patterns = patterns if patterns else []  # (base folder, pattern)
+
+    @classmethod
+    def from_patterns(cls, base_folder: str, patterns: list[str]) -> "IgnoreRules":
+        return cls([(base_folder, pattern) for pattern in _clean_patterns(patterns)])
+
+    def with_ignore_file(self, folder_path: str) -> "IgnoreRules":
+        """rules extended with the patterns of the ignore file inside folder_path, applicable to the subtree of folder_path"""
+        ignore_file_path = os.path.join(folder_path, constants.IGNORE_FILE_NAME)
+        try:
+            with open(ignore_file_path, "r", encoding="utf-8") as ignore_file:
+                patterns = ignore_file.read().splitlines()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"unable to read {ignore_file_path}, error:\n{e}")
+            return self
+        return IgnoreRules(self.patterns + IgnoreRules.from_patterns(folder_path, patterns).patterns)
+
+    def is_ignored(self, directory_path: str) -> bool:
+        name = os.path.basename(directory_path)
+        for base_folder, pattern in self.patterns:
+            if "/" in pattern:
+                relative_path = os.path.relpath(directory_path, base_folder).replace(os.sep, "/")
+                if fnmatch(relative_path, pattern):
+                    return True
+            elif fnmatch(name, pattern):
+                return True
+        return False
+
+
+def _clean_patterns(patterns: list[str]) -> list[str]:
+    cleaned_patterns: list[str] = []
+    for pattern in patterns:
+        pattern = pattern.strip().strip("/")
+        if pattern and not pattern.startswith("#"):
+            cleaned_patterns.append(pattern)
+    return cleaned_patterns
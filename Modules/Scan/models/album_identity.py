@@ -0,0 +1,33 @@
+from typing import Literal, NamedTuple
+from pydantic import BaseModel
+
+IDENTITY_KEY = Literal["vgmdb_link", "album", "catalog", "barcode", "date"]
+IDENTITY_KEYS: list[IDENTITY_KEY] = ["vgmdb_link", "album", "catalog", "barcode", "date"]  # in order of priority
+SPLIT_KEYS: list[IDENTITY_KEY] = ["vgmdb_link", "catalog", "barcode", "album"]  # keys used for splitting tracks of different albums, most specific first
+
+
+class TrackIdentity(NamedTuple):
+    """values of every identity key of a track, tracks with identical tags have equal (and equally hashed) identities"""
+
+    vgmdb_link: tuple[str, ...]
+    album: tuple[str, ...]
+    catalog: tuple[str, ...]
+    barcode: tuple[str, ...]
+    date: tuple[str, ...]  # only full dates (YYYY-MM-DD) are considered
+
+
+class AlbumMatchResult(BaseModel):
+    """
+    verdict on whether a group of tracks belongs to a single album
+    matched_key and matched_value tell which tag is common amongst all tracks,
+    otherwise split_key and groups tell how the tracks split into different albums (if there is a key present in every track)
+    """
+
+    matched_key: IDENTITY_KEY | None = None
+    matched_value: str | None = None
+    split_key: IDENTITY_KEY | None = None
+    groups: dict[str, list[int]] = {}  # value of split_key -> indices of the tracks having that value, in the original order of tracks
+
+    @property
+    def is_single_album(self) -> bool:
+        return self.matched_key is not None
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+
+
+class DuplicateTracks(BaseModel):
+    content_key: str
+    file_paths: list[str]
+
+
+class DuplicateAlbums(BaseModel):
+    """album folders containing exactly the same audio streams"""
+
+    album_folder_paths: list[str]
+    total_tracks: int
+
+
+class DuplicateReport(BaseModel):
+    duplicate_tracks: list[DuplicateTracks] = []
+    duplicate_albums: list[DuplicateAlbums] = []
+    files_hashed: int = 0
+    read_errors: int = 0
+
+    def pprint(self) -> str:
+        lines = [f"files hashed: {self.files_hashed}, read errors: {self.read_errors}, duplicate tracks: {len(self.duplicate_tracks)}, duplicate albums: {len(self.duplicate_albums)}"]
+        for duplicate_albums in self.duplicate_albums:
+            lines.append(f"\nsame {duplicate_albums.total_tracks} tracks in:")
+            lines.extend(f"    {album_folder_path}" for album_folder_path in duplicate_albums.album_folder_paths)
+        for duplicate_tracks in self.duplicate_tracks:
+            lines.append(f"\nsame audio ({duplicate_tracks.content_key}) in:")
+            lines.extend(f"    {file_path}" for file_path in duplicate_tracks.file_paths)
+        return "\n".join(lines)
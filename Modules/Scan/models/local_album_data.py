@@ -8,15 +8,34 @@ from Modules.Organize.template import TemplateResolver
 sys.path.append(os.getcwd())
 # REMOVE
 from pydantic import BaseModel, ConfigDict, Field
-from unigen import IAudioManager
+from unigen import AudioFactory, IAudioManager
 from Modules.Print.constants import LINE_SEPARATOR, SUB_LINE_SEPARATOR
+from Modules.Scan.models.track_tags import TrackTags
 
 
 class LocalTrackData(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    model_config = ConfigDict(arbitrary_types_allowed=True, populate_by_name=True)
     file_path: str = Field(frozen=True)
     depth_in_parent_folder: int
-    audio_manager: IAudioManager
+    tags: TrackTags | None = None  # tags read while scanning, possibly from the scan cache without opening the file
+    loaded_audio_manager: IAudioManager | None = Field(default=None, alias="audio_manager")
+
+    @property
+    def audio_manager(self) -> IAudioManager:
+        """the audio manager is only built when it is needed (for tagging, organizing, etc) if the track was scanned from cache"""
+        if self.loaded_audio_manager is None:
+            self.loaded_audio_manager = AudioFactory.buildAudioManager(self.file_path)
+        return self.loaded_audio_manager
+
+    @property
+    def scanned_tags(self) -> TrackTags:
+        if self.tags is None:
+            self.tags = TrackTags.from_audio_manager(self.audio_manager)
+        return self.tags
+
+    def release_audio_manager(self):
+        """drops the audio manager (along with its parsed tags and pictures), it will be built again if needed"""
+        self.loaded_audio_manager = None
 
     @property
     def file_name(self) -> str:
@@ -42,7 +61,7 @@ class LocalTrackData(BaseModel):
         bitrate = None
 
         extension = self.extension.lower().strip()
-        info = self.audio_manager.getMediaInfo()
+        info = self.scanned_tags.media_info
         if extension in [".flac", ".wav"]:
             codec = "FLAC" if extension == ".flac" else "WAV"
             bits = info.bits_per_sample
@@ -128,6 +147,7 @@ class LocalAlbumData(BaseModel):
     album_folder_path: str
     discs: dict[int, LocalDiscData] = {}  # files with proper disc number (default = 1) and track numbers already present
     unclean_tracks: list[LocalTrackData] = []  # files without track number tags, maybe we can still tag them somehow? (accoust_id, name similarity, etc)
+    split_group: str | None = None  # set when the album was split from a folder containing multiple albums, value of the tag used for splitting
 
     @property
     def album_folder_name(self) -> str:
@@ -167,6 +187,11 @@ class LocalAlbumData(BaseModel):
         tracks.extend([track for _, disc in self.discs.items() for _, track in disc.tracks.items()])
         return tracks
 
+    def release_audio_managers(self):
+        """release the audio managers of all tracks once the album has been processed, keeping memory flat across recursive runs"""
+        for track in self.get_all_tracks():
+            track.release_audio_manager()
+
     def get_one_sample_track(self) -> LocalTrackData:
         all_tracks = self.get_all_tracks()
         return all_tracks[0] if all_tracks else self.unclean_tracks[0]  # if there are no clean tracks, there must be at least one unclean track
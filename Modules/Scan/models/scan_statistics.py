@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+
+
+class ScanStatistics(BaseModel):
+    """counters for the files seen while scanning, useful for finding out where the scan time is spent"""
+
+    ignored_directories: int = 0
+    files_seen: int = 0
+    skipped_by_extension: int = 0
+    skipped_by_signature: int = 0
+    read_from_cache: int = 0
+    read_from_disk: int = 0
+    read_errors: int = 0
+
+    def pprint(self) -> str:
+        return (
+            f"ignored directories: {self.ignored_directories}, files seen: {self.files_seen}, skipped by extension: {self.skipped_by_extension}, skipped by signature: {self.skipped_by_signature}, "
+            f"read from cache: {self.read_from_cache}, read from disk: {self.read_from_disk}, read errors: {self.read_errors}"
+        )
@@ -0,0 +1,24 @@
+import os
+from dataclasses import dataclass
+
+from Modules.Scan.models.local_album_data import LocalTrackData
+from Modules.Scan.models.track_tags import TrackTags
+
+
+@dataclass(slots=True)
+class ScannedTrack:
+    """
+    compact record of a track used internally by the Scanner while scanning (no validation, no per instance __dict__)
+    only tracks of the albums which are actually found are converted into LocalTrackData
+    """
+
+    file_path: str
+    depth_in_parent_folder: int
+    tags: TrackTags
+
+    @property
+    def file_name(self) -> str:
+        return os.path.basename(os.path.normpath(self.file_path))
+
+    def to_local_track_data(self) -> LocalTrackData:
+        return LocalTrackData(file_path=self.file_path, depth_in_parent_folder=self.depth_in_parent_folder, tags=self.tags)
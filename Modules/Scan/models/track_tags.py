@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from unigen import IAudioManager, MediaInfo
+
+from Modules.Tag import custom_tags
+
+
+class TrackTags(BaseModel):
+    """
+    snapshot of the tags that are needed while scanning and searching for an album
+    it is small enough to be cached on disk, so unchanged files do not have to be opened again in later runs
+    """
+
+    album: list[str] = []
+    catalog: list[str] = []
+    barcode: list[str] = []
+    date: str | None = None
+    disc_number: int | None = None
+    track_number: int | None = None
+    vgmdb_link: list[str] = []
+    vgmdb_id: list[str] = []
+    media_info: MediaInfo = MediaInfo()
+
+    @classmethod
+    def from_audio_manager(cls, audio_manager: IAudioManager) -> "TrackTags":
+        return cls(
+            album=audio_manager.getAlbum(),
+            catalog=audio_manager.getCatalog(),
+            barcode=audio_manager.getBarcode(),
+            date=audio_manager.getDate(),
+            disc_number=audio_manager.getDiscNumber(),
+            track_number=audio_manager.getTrackNumber(),
+            vgmdb_link=audio_manager.getCustomTag(custom_tags.VGMDB_LINK),
+            vgmdb_id=audio_manager.getCustomTag(custom_tags.VGMDB_ID),
+            media_info=audio_manager.getMediaInfo(),
+        )
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import threading
+
+from Modules.Scan import constants
+from Modules.Scan.models.track_tags import TrackTags
+from Modules.Utils.general_utils import get_data_dir, get_default_logger
+
+"""
+on-disk cache of the tags read while scanning
+entries are keyed by absolute file path, size and mtime_ns, so any modification of a file (like tagging it) automatically invalidates its entry
+"""
+
+logger = get_default_logger(__name__, "info")
+
+
+class ScanCache:
+    def __init__(self, database_path: str | None = None):
+        self.database_path = database_path if database_path else os.path.join(get_data_dir(), constants.SCAN_CACHE_FILE_NAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tracks (
+                    file_path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    tags TEXT NOT NULL
+                )
+                """
+            )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: str, stat: os.stat_result) -> TrackTags | None:
+        """returns the cached tags if the file has not changed since it was cached"""
+        with self.lock:
+            row = self.connection.execute("SELECT tags FROM tracks WHERE file_path = ? AND size = ? AND mtime_ns = ?", (file_path, stat.st_size, stat.st_mtime_ns)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            tags = TrackTags.model_validate_json(row[0])
+        except ValueError as e:
+            logger.debug(f"discarding invalid cache entry for {file_path}, error: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tags
+
+    def set_many(self, entries: list[tuple[str, os.stat_result, TrackTags]]):
+        if not entries:
+            return
+        rows = [(file_path, stat.st_size, stat.st_mtime_ns, tags.model_dump_json()) for file_path, stat, tags in entries]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO tracks (file_path, size, mtime_ns, tags) VALUES (?, ?, ?, ?)", rows)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
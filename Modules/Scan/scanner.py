@@ -1,12 +1,24 @@
 import os
-from typing import Optional
+import collections
+import concurrent.futures
+from typing import Iterator, Optional
 from Modules.Print.constants import SUB_LINE_SEPARATOR
 
 from Modules.Scan import constants
-from Modules.Tag import custom_tags
+from Modules.Scan.album_identity import match_album_identity
+from Modules.Scan.audio_file_filter import has_audio_file_signature, has_supported_extension
+from Modules.Scan.content_key import get_audio_content_key
+from Modules.Scan.walker import DirectoryNode, DirectoryWalker
+from Modules.Scan.models.album_identity import AlbumMatchResult
+from Modules.Scan.models.duplicates import DuplicateAlbums, DuplicateReport, DuplicateTracks
 from Modules.Scan.models.local_album_data import LocalAlbumData, LocalTrackData
-from Modules.Utils.general_utils import get_default_logger, is_date_in_YYYY_MM_DD, cleanDate
-from unigen import AudioFactory, UnsupportedFileFormatError, isFileFormatSupported
+from Modules.Scan.models.scanned_track import ScannedTrack
+from Modules.Scan.models.scan_statistics import ScanStatistics
+from Modules.Scan.models.track_tags import TrackTags
+from Modules.Scan.scan_cache import ScanCache
+from Modules.Scan.tag_reader import read_track_tags
+from Modules.Utils.general_utils import get_default_logger
+from unigen import AudioFactory, UnsupportedFileFormatError
 
 
 """
@@ -37,67 +49,245 @@ logger = get_default_logger(__name__, "info")
 
 
 class Scanner:
-    def __init__(self, ensure_album_match: bool = True):
+    def __init__(
+        self,
+        ensure_album_match: bool = True,
+        num_threads: int = 1,
+        scan_cache: ScanCache | None = None,
+        verify_file_signatures: bool = False,
+        light_scan: bool = False,
+        split_mixed_folders: bool = False,
+        ignore_patterns: list[str] | None = None,
+        listing_threads: int = 1,
+    ):
+        """
+        num_threads > 1 reads the audio files of an album candidate in parallel, which helps a lot on network storage
+        scan_cache is used for reading the tags of unchanged files without opening them
+        verify_file_signatures checks the first bytes of audio files before reading them, rejecting misnamed files without building an audio manager
+        light_scan only reads text tags and stream info (skipping embedded pictures where possible) instead of building full audio managers
+        split_mixed_folders splits a folder containing tracks of multiple albums into those albums (by vgmdb link, catalog, barcode or album name) instead of skipping it
+        ignore_patterns are glob patterns of directories which are never listed (see ignore_rules.py), .taggerignore files inside the scanned folders add to them
+        listing_threads > 1 lists the directories of the tree in parallel (a level at a time), the resulting tree is the same as a sequential walk
+        """
         self.ensure_album_match = ensure_album_match
+        self.num_threads = num_threads
+        self.scan_cache = scan_cache
+        self.verify_file_signatures = verify_file_signatures
+        self.light_scan = light_scan
+        self.split_mixed_folders = split_mixed_folders
+        self.statistics = ScanStatistics()
+        self.walker = DirectoryWalker(ignore_patterns, num_threads=listing_threads)
 
     def scan_albums_recursively(self, root_dir: str) -> list[LocalAlbumData]:
         """scans for all albums inside root_folder recursively"""
+        return list(self.iter_albums(root_dir))
+
+    def iter_albums(self, root_dir: str) -> Iterator[LocalAlbumData]:
+        """scans for all albums inside root_folder recursively, yielding every album as soon as it is confirmed"""
         root_dir = self._convert_path_to_absolute(root_dir)
-        max_depths: dict[str, int] = {}
-        self._precalculate_max_depths_with_audio_files(root_dir, max_depths)
-        albums = self._scan_albums_recursively(root_dir, max_depths)
-        return albums
+        root_node = self._walk(root_dir)
+        yield from self._iter_albums(root_node)
 
     def scan_album_in_folder_if_exists(self, folder_path: str) -> Optional[LocalAlbumData]:
         """returns a single album if the given folders contains files belonging to a single album"""
         folder_path = self._convert_path_to_absolute(folder_path)
-        logger.info(SUB_LINE_SEPARATOR)
-        logger.info(f"Scanning {folder_path}")
-        logger.info(SUB_LINE_SEPARATOR)
-        audio_files = self.get_supported_audio_files_in_folder(folder_path)
-        if self.ensure_album_match and not self._does_audio_files_belong_to_one_album_only(audio_files):
-            return None
-        return self._compile_album_data_from_track_data(folder_path, audio_files)
+        return self._scan_album_in_directory_if_exists(self._walk(folder_path))
+
+    def scan_albums_in_folder(self, folder_path: str) -> list[LocalAlbumData]:
+        """like scan_album_in_folder_if_exists, but a folder containing files of multiple albums is split into those albums if split_mixed_folders is enabled"""
+        folder_path = self._convert_path_to_absolute(folder_path)
+        return self._scan_albums_in_directory(self._walk(folder_path), self.split_mixed_folders)
+
+    def scan_albums_containing_folder(self, folder_path: str, root_dir: str) -> list[LocalAlbumData]:
+        """
+        scans the album(s) which folder_path is a part of, only looking at the folder and its parents up to the album depth
+        parents are limited to the folders inside root_dir (root_dir itself is considered only if it is folder_path), so that a change never causes the whole library to be listed
+        used for rescanning only the albums in which something changed, the outermost folder which can be an album is preferred like in scan_albums_recursively
+        """
+        folder_path, root_dir = self._convert_path_to_absolute(folder_path), self._convert_path_to_absolute(root_dir)
+        if os.path.commonpath([folder_path, root_dir]) != root_dir:
+            return []
+        candidate_folders = [folder_path]
+        while len(candidate_folders) < constants.MAX_FOLDER_DEPTH_OF_ALBUM and candidate_folders[-1] != root_dir and os.path.dirname(candidate_folders[-1]) != root_dir:
+            candidate_folders.append(os.path.dirname(candidate_folders[-1]))
+        for candidate_folder in reversed(candidate_folders):
+            directory = self._walk(candidate_folder)
+            max_depth = directory.max_depth_with_audio_files
+            if max_depth != -1 and max_depth <= constants.MAX_FOLDER_DEPTH_OF_ALBUM:
+                albums = self._scan_albums_in_directory(directory, self.split_mixed_folders)
+                if albums:
+                    return albums
+        return []
 
     def get_supported_audio_files_in_folder(self, folder_path: str, max_depth: int = -1) -> list[LocalTrackData]:
         """get a list of all supported audio files inside a folder, provide max_depth for recursion depth while scanning"""
         folder_path = self._convert_path_to_absolute(folder_path)
-        return self._get_supported_audio_files_in_folder(folder_path, max_depth)
+        return [track.to_local_track_data() for track in self._get_supported_audio_files_in_directory(self._walk(folder_path, max_depth))]
+
+    def find_duplicates(self, root_dir: str) -> DuplicateReport:
+        """
+        finds tracks and albums with identical audio across the whole library using the content keys of the audio files (see content_key.py)
+        no tags are read and no audio is decoded, album folders are decided from the folder structure alone
+        """
+        root_dir = self._convert_path_to_absolute(root_dir)
+        album_files = self._get_files_of_album_folders(self._walk(root_dir))
+        file_paths = [file_path for _, album_file_paths in album_files for file_path in album_file_paths]
+        if self.num_threads > 1 and len(file_paths) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+                content_keys = list(executor.map(self._get_content_key, file_paths))
+        else:
+            content_keys = [self._get_content_key(file_path) for file_path in file_paths]
+
+        report = DuplicateReport()
+        file_paths_of_content_key: dict[str, list[str]] = {}
+        content_key_of_file_path: dict[str, str] = {}
+        for file_path, content_key in zip(file_paths, content_keys):
+            if isinstance(content_key, Exception):
+                report.read_errors += 1
+                logger.error(f"unable to hash the file at {file_path}, error:\n{content_key}")
+                continue
+            if content_key is None:
+                continue
+            report.files_hashed += 1
+            file_paths_of_content_key.setdefault(content_key, []).append(file_path)
+            content_key_of_file_path[file_path] = content_key
+        report.duplicate_tracks = [DuplicateTracks(content_key=content_key, file_paths=paths) for content_key, paths in file_paths_of_content_key.items() if len(paths) > 1]
+
+        album_folders_of_content: dict[frozenset[str], list[str]] = {}
+        for album_folder_path, album_file_paths in album_files:
+            album_content = frozenset(content_key_of_file_path[file_path] for file_path in album_file_paths if file_path in content_key_of_file_path)
+            if album_content:
+                album_folders_of_content.setdefault(album_content, []).append(album_folder_path)
+        report.duplicate_albums = [DuplicateAlbums(album_folder_paths=folders, total_tracks=len(album_content)) for album_content, folders in album_folders_of_content.items() if len(folders) > 1]
+        return report
 
     # private functions
-    def _get_supported_audio_files_in_folder(self, folder_path: str, max_depth: int, current_depth: int = 1) -> list[LocalTrackData]:
-        if max_depth > 0 and current_depth > max_depth:
-            return []
-        audio_tracks: list[LocalTrackData] = []
-        for entry in os.listdir(folder_path):
-            entry_path = os.path.join(folder_path, entry)
-            if os.path.isfile(entry_path):
-                try:
-                    audio_manager = AudioFactory.buildAudioManager(entry_path)
-                    audio_tracks.append(LocalTrackData(file_path=entry_path, audio_manager=audio_manager, depth_in_parent_folder=current_depth))
-                except UnsupportedFileFormatError:
-                    pass
-                except Exception as e:
-                    logger.error(f"unable to read the file at {folder_path}, error:\n{e}")
-            elif os.path.isdir(entry_path):
-                audio_tracks.extend(self._get_supported_audio_files_in_folder(entry_path, max_depth, current_depth + 1))
-        return audio_tracks
-
-    def _compile_album_data_from_track_data(self, parent_directory: str, audio_files: list[LocalTrackData]) -> LocalAlbumData:
-        """it is considered a guarantee that the audio_files array represents tracks of a single album"""
-        album_data = LocalAlbumData(album_folder_path=parent_directory)
+    def _walk(self, folder_path: str, max_depth: int = -1) -> DirectoryNode:
+        root_node = self.walker.walk(folder_path, max_depth)
+        self.statistics.ignored_directories += len(self.walker.ignored_directories)
+        return root_node
+
+    def _scan_album_in_directory_if_exists(self, directory: DirectoryNode) -> Optional[LocalAlbumData]:
+        albums = self._scan_albums_in_directory(directory, split_mixed_folder=False)
+        return albums[0] if albums else None
+
+    def _scan_albums_in_directory(self, directory: DirectoryNode, split_mixed_folder: bool) -> list[LocalAlbumData]:
+        logger.info(SUB_LINE_SEPARATOR)
+        logger.info(f"Scanning {directory.path}")
+        logger.info(SUB_LINE_SEPARATOR)
+        audio_files = self._get_supported_audio_files_in_directory(directory)
+        if not self.ensure_album_match:
+            return [self._compile_album_data_from_track_data(directory.path, audio_files)]
+
+        match_result = self._match_album_identity(audio_files)
+        if match_result.is_single_album:
+            return [self._compile_album_data_from_track_data(directory.path, audio_files)]
+        if split_mixed_folder and len(match_result.groups) > 1 and not self._has_album_subfolder(directory, audio_files):
+            logger.info(f"splitting {directory.path} into {len(match_result.groups)} albums by {match_result.split_key}")
+            return [self._compile_album_data_from_track_data(directory.path, [audio_files[index] for index in indices], split_group=value) for value, indices in match_result.groups.items()]
+        return []
+
+    def _get_supported_audio_files_in_directory(self, directory: DirectoryNode) -> list[ScannedTrack]:
+        """the directory tree is already limited to the required depth by the walker"""
+        files = self._get_files_in_directory(directory)
+        audio_tracks: list[ScannedTrack | None] = [None] * len(files)
+
+        # unchanged files are answered from the scan cache without opening them
+        indices_to_read: list[int] = []
+        for index, (entry, _, depth) in enumerate(files):
+            cached_tags = self._get_cached_tags(entry)
+            if cached_tags:
+                self.statistics.read_from_cache += 1
+                audio_tracks[index] = ScannedTrack(entry.path, depth, cached_tags)
+            else:
+                indices_to_read.append(index)
+
+        file_paths = [files[index][0].path for index in indices_to_read]
+        if self.num_threads > 1 and len(file_paths) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+                read_results = list(executor.map(self._read_audio_file, file_paths))  # map keeps the order of the files
+        else:
+            read_results = [self._read_audio_file(file_path) for file_path in file_paths]
+
+        new_cache_entries: list[tuple[str, os.stat_result, TrackTags]] = []
+        for index, read_result in zip(indices_to_read, read_results):
+            entry, folder_path, depth = files[index]
+            if read_result is None:
+                self.statistics.skipped_by_signature += 1
+                continue
+            if isinstance(read_result, UnsupportedFileFormatError):
+                self.statistics.skipped_by_extension += 1
+                continue
+            if isinstance(read_result, Exception):
+                self.statistics.read_errors += 1
+                logger.error(f"unable to read the file at {folder_path}, error:\n{read_result}")
+                continue
+            self.statistics.read_from_disk += 1
+            audio_tracks[index] = ScannedTrack(entry.path, depth, read_result)
+            stat = self._get_stat(entry)
+            if stat:
+                new_cache_entries.append((entry.path, stat, read_result))
+        if self.scan_cache:
+            self.scan_cache.set_many(new_cache_entries)
+
+        return [track for track in audio_tracks if track]
+
+    def _get_files_in_directory(self, directory: DirectoryNode, current_depth: int = 1) -> list[tuple[os.DirEntry[str], str, int]]:
+        """returns (file entry, containing folder path, depth) for every file with a supported extension in the directory tree in listing order"""
+        files: list[tuple[os.DirEntry[str], str, int]] = []
+        for entry in directory.entries:
+            if entry.path in directory.subdirectories:
+                files.extend(self._get_files_in_directory(directory.subdirectories[entry.path], current_depth + 1))
+            elif entry.is_file():
+                self.statistics.files_seen += 1
+                if not has_supported_extension(entry.name):
+                    self.statistics.skipped_by_extension += 1
+                    continue
+                files.append((entry, directory.path, current_depth))
+        return files
+
+    def _get_cached_tags(self, entry: os.DirEntry[str]) -> TrackTags | None:
+        if not self.scan_cache:
+            return None
+        stat = self._get_stat(entry)
+        return self.scan_cache.get(entry.path, stat) if stat else None
+
+    def _get_stat(self, entry: os.DirEntry[str]) -> os.stat_result | None:
+        try:
+            return entry.stat()  # cached by the DirEntry after the first call
+        except OSError:
+            return None
+
+    def _read_audio_file(self, file_path: str) -> TrackTags | Exception | None:
+        """
+        exceptions are returned instead of being raised so that they can be logged in order after reading files in parallel
+        returns None if the file is rejected by its signature. only the tags are kept, audio managers are built again when the album is operated on,
+        so that the scanned albums waiting in the look ahead (or a prefetch batch) do not keep whole files with their pictures in memory
+        """
+        if self.verify_file_signatures and not has_audio_file_signature(file_path):
+            return None
+        try:
+            if self.light_scan:
+                return read_track_tags(file_path)
+            return TrackTags.from_audio_manager(AudioFactory.buildAudioManager(file_path))
+        except Exception as e:
+            return e
+
+    def _compile_album_data_from_track_data(self, parent_directory: str, audio_files: list[ScannedTrack], split_group: str | None = None) -> LocalAlbumData:
+        """it is considered a guarantee that the audio_files array represents tracks of a single album, tracks are converted to LocalTrackData here"""
+        album_data = LocalAlbumData(album_folder_path=parent_directory, split_group=split_group)
 
         # mapping tracks and discs
         for track_number_internal, track in enumerate(audio_files):
             if not self.ensure_album_match:
                 # Since the tracks are individual files, we don't need to match anything
-                album_data.set_track(1, track_number_internal + 1, track)  # disc number is not important here, just to avoid conflicts
+                album_data.set_track(1, track_number_internal + 1, track.to_local_track_data())  # disc number is not important here, just to avoid conflicts
                 continue
 
-            disc_number, track_number = track.audio_manager.getDiscNumber(), track.audio_manager.getTrackNumber()
+            disc_number, track_number = track.tags.disc_number, track.tags.track_number
             if not track_number:
                 logger.info(f"track number not present in {track.file_name}, adding to unclean tracks")
-                album_data.unclean_tracks.append(track)
+                album_data.unclean_tracks.append(track.to_local_track_data())
                 continue
             else:
                 track_number = int(track_number)
@@ -113,7 +303,7 @@ class Scanner:
                 logger.error(f"{track.file_path} conflicts with {existing_track.file_path}, skipping this file")
                 continue
 
-            album_data.set_track(disc_number, track_number, track)
+            album_data.set_track(disc_number, track_number, track.to_local_track_data())
 
         # # setting the disc name if files are under a folder inside the album
         # def get_disc_folder_name(parent_directory: str, file_path: str) -> str | None:
@@ -132,64 +322,51 @@ class Scanner:
 
         return album_data
 
-    def _does_audio_files_belong_to_one_album_only(self, audio_files: list[LocalTrackData]) -> bool:
-        if not audio_files:
-            return False
-
-        def has_identical_items_list_of_list(arr: list[list[str]]) -> bool:
-            common_items = set(arr[0])
-            for item in arr:
-                common_items.intersection_update(item)
-                if len(common_items) == 0:
-                    return False
-            return True
-
-        def has_identical_items_list_of_string(arr: list[str]) -> bool:
-            return len(set(arr)) == len(arr)
-
-        if has_identical_items_list_of_list([track.audio_manager.getCustomTag(custom_tags.VGMDB_LINK) for track in audio_files]):
-            return True
-        if has_identical_items_list_of_list([track.audio_manager.getAlbum() for track in audio_files]):
-            return True
-        if has_identical_items_list_of_list([track.audio_manager.getCatalog() for track in audio_files]):
-            return True
-        if has_identical_items_list_of_list([track.audio_manager.getBarcode() for track in audio_files]):
-            return True
-        dates = [track.audio_manager.getDate() for track in audio_files]
-        if None not in dates:
-            cleaned_dates = [date for date in dates if date is not None]
-            if all(is_date_in_YYYY_MM_DD(cleanDate(date)) for date in cleaned_dates) and has_identical_items_list_of_string(cleaned_dates):
-                return True
-        return False
-
-    def _scan_albums_recursively(self, folder_path: str, max_depths: dict[str, int]) -> list[LocalAlbumData]:
-        max_depth = max_depths[folder_path]
+    def _match_album_identity(self, audio_files: list[ScannedTrack]) -> AlbumMatchResult:
+        match_result = match_album_identity([track.tags for track in audio_files])
+        if match_result.is_single_album:
+            logger.debug(f"files belong to one album, common {match_result.matched_key}: {match_result.matched_value}")
+        elif match_result.groups:
+            split = ", ".join(f"{value}: {len(indices)} files" for value, indices in match_result.groups.items())
+            logger.debug(f"files belong to {len(match_result.groups)} albums by {match_result.split_key}, {split}")
+        return match_result
+
+    def _has_album_subfolder(self, directory: DirectoryNode, audio_files: list[ScannedTrack]) -> bool:
+        """whether the files of a subfolder belong to a single album, such subfolders are scanned on their own instead of splitting the parent folder"""
+        tags_of_subfolders: dict[str, list[TrackTags]] = collections.defaultdict(list)
+        for track in audio_files:
+            relative_path = os.path.relpath(track.file_path, directory.path)
+            if os.sep in relative_path:
+                tags_of_subfolders[relative_path.split(os.sep)[0]].append(track.tags)
+        return any(match_album_identity(tags).is_single_album for tags in tags_of_subfolders.values())
+
+    def _iter_albums(self, directory: DirectoryNode) -> Iterator[LocalAlbumData]:
+        max_depth = directory.max_depth_with_audio_files
         if max_depth != -1 and max_depth <= constants.MAX_FOLDER_DEPTH_OF_ALBUM:  # audio files exist somewhere inside the folder
-            found_album = self.scan_album_in_folder_if_exists(folder_path)
-            if found_album:
-                return [found_album]
-
-        found_albums: list[LocalAlbumData] = []
-        for entry in os.listdir(folder_path):
-            entry_path = os.path.join(folder_path, entry)
-            if os.path.isdir(entry_path):
-                inner_albums = self._scan_albums_recursively(entry_path, max_depths)
-                found_albums.extend(inner_albums)
-        return found_albums
-
-    def _precalculate_max_depths_with_audio_files(self, folder_path: str, max_depths: dict[str, int]):
-        """returns: whether the folder contains any audio file"""
-        max_depth = -1
-        for entry in os.listdir(folder_path):
-            entry_path = os.path.join(folder_path, entry)
-            if os.path.isdir(entry_path):
-                self._precalculate_max_depths_with_audio_files(entry_path, max_depths)
-                if max_depths[entry_path] != -1:  # there is an audio file inside entry_path
-                    max_depth = max(max_depth, 1 + max_depths[entry_path])
-            elif os.path.isfile(entry_path) and isFileFormatSupported(entry_path):
-                max_depth = max(max_depth, 1)
-
-        max_depths[folder_path] = max_depth
+            found_albums = self._scan_albums_in_directory(directory, self.split_mixed_folders)
+            if found_albums:
+                yield from found_albums
+                return
+
+        for subdirectory in directory.get_subdirectories():
+            yield from self._iter_albums(subdirectory)
+
+    def _get_files_of_album_folders(self, directory: DirectoryNode) -> list[tuple[str, list[str]]]:
+        """(album folder, audio file paths) for every folder which can be an album going by the folder structure, like _iter_albums"""
+        max_depth = directory.max_depth_with_audio_files
+        if max_depth != -1 and max_depth <= constants.MAX_FOLDER_DEPTH_OF_ALBUM:
+            return [(directory.path, [entry.path for entry, _, _ in self._get_files_in_directory(directory)])]
+        album_files: list[tuple[str, list[str]]] = []
+        for subdirectory in directory.get_subdirectories():
+            album_files.extend(self._get_files_of_album_folders(subdirectory))
+        return album_files
+
+    def _get_content_key(self, file_path: str) -> str | Exception | None:
+        """exceptions are returned instead of being raised, like _read_audio_file"""
+        try:
+            return get_audio_content_key(file_path)
+        except Exception as e:
+            return e
 
     def _convert_path_to_absolute(self, path: str) -> str:
         if os.path.isabs(path):
@@ -0,0 +1,52 @@
+import os
+import struct
+from mutagen.flac import Picture as PictureFLAC
+from unigen import AudioFactory
+from unigen.wrapper.vorbis import CustomFLAC, VorbisWrapper
+
+from Modules.Scan.models.track_tags import TrackTags
+
+"""
+light weight tag reading used while scanning.
+only the text tags and stream info are needed for finding albums, so no audio manager is kept around after reading the tags.
+for flac files, embedded picture blocks (usually a few MBs each) are skipped without being read at all.
+other formats are read using the full audio manager, which is dropped as soon as the tags are extracted.
+"""
+
+
+class _SkippedPicture(PictureFLAC):
+    """flac picture block which only reads the picture header, seeking past the actual image data"""
+
+    def load(self, data):
+        self.type, length = struct.unpack(">2I", data.read(8))
+        self.mime = data.read(length).decode("UTF-8", "replace")
+        (length,) = struct.unpack(">I", data.read(4))
+        self.desc = data.read(length).decode("UTF-8", "replace")
+        (self.width, self.height, self.depth, self.colors, length) = struct.unpack(">5I", data.read(20))
+        data.seek(length, os.SEEK_CUR)
+
+
+class _HeaderOnlyFLAC(CustomFLAC):
+    METADATA_BLOCKS = [_SkippedPicture if block is PictureFLAC else block for block in CustomFLAC.METADATA_BLOCKS]
+
+
+class _HeaderOnlyFlacWrapper(VorbisWrapper):
+    """read only flac wrapper, must never be saved since picture data is not loaded"""
+
+    def __init__(self, file_path: str):
+        self.extension = ".flac"
+        self.audio = _HeaderOnlyFLAC(file_path)
+        self.file_path = file_path
+
+    def save(self) -> None:
+        raise PermissionError(f"{self.file_path} was opened in header only mode and cannot be saved")
+
+
+def read_track_tags(file_path: str) -> TrackTags:
+    """reads the tags needed for scanning without keeping the audio manager (and the embedded pictures) in memory"""
+    _, extension = os.path.splitext(file_path)
+    if extension.lower() == ".flac":
+        audio_manager = _HeaderOnlyFlacWrapper(file_path)
+    else:
+        audio_manager = AudioFactory.buildAudioManager(file_path)
+    return TrackTags.from_audio_manager(audio_manager)
@@ -0,0 +1,132 @@
+import os
+import concurrent.futures
+from typing import Callable, Iterable
+
+from Modules.Scan import constants
+from Modules.Scan.ignore_rules import IgnoreRules
+from Modules.Utils.general_utils import get_default_logger
+from unigen import isFileFormatSupported
+
+"""
+single pass directory walker used by the Scanner.
+every directory is listed exactly once (breadth first, a whole level at a time) using os.scandir, the resulting DirEntry objects (which carry the cached file type from the listing)
+are kept in an in-memory tree which is then used for:
+    * calculating the maximum depth at which audio files exist under a folder
+    * deciding which folders are album candidates
+    * collecting the audio files of an album
+directories matching the ignore rules (see ignore_rules.py) are pruned along with their whole subtree without being listed
+"""
+
+logger = get_default_logger(__name__, "info")
+
+
+class DirectoryNode:
+    """a directory listed once, along with its (already listed) subdirectories"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: list[os.DirEntry[str]] = []  # kept in listing order so that file collection order stays the same as before
+        self.subdirectories: dict[str, "DirectoryNode"] = {}  # entry path -> node
+        self.max_depth_with_audio_files = -1  # -1 means no audio file exists anywhere inside this directory
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    def get_subdirectories(self) -> list["DirectoryNode"]:
+        """subdirectories in listing order"""
+        return [self.subdirectories[entry.path] for entry in self.entries if entry.path in self.subdirectories]
+
+
+class DirectoryWalker:
+    def __init__(self, ignore_patterns: list[str] | None = None, num_threads: int = 1):
+        """
+        ignore_patterns are glob patterns of directories to prune, applied relative to the walked root_dir
+        num_threads > 1 lists the directories of every level in parallel, which hides the round trip latency of network mounts (NFS, SMB)
+        """
+        self.ignore_patterns = ignore_patterns if ignore_patterns else []
+        self.num_threads = num_threads
+        self.ignored_directories: list[str] = []  # directories pruned in the last walk
+
+    def walk(self, root_dir: str, max_depth: int = -1) -> DirectoryNode:
+        """
+        list root_dir and all of its subdirectories exactly once, breadth first
+        provide max_depth to stop listing beyond that depth (root_dir is at depth 1), max depths are then only valid within the listed levels
+        """
+        self.ignored_directories = []
+        root_node = DirectoryNode(root_dir)
+        if self.num_threads > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+                levels = self._walk(root_node, max_depth, executor.map)
+        else:
+            levels = self._walk(root_node, max_depth, map)
+        for level in reversed(levels):  # children are complete before their parents
+            for node in level:
+                self._calculate_max_depth_with_audio_files(node)
+        return root_node
+
+    # private functions
+    def _walk(self, root_node: DirectoryNode, max_depth: int, map_function: Callable[..., Iterable[list[os.DirEntry[str]]]]) -> list[list[DirectoryNode]]:
+        """lists the tree level by level, returns the nodes of every level"""
+        levels: list[list[DirectoryNode]] = []
+        current_level = [(root_node, IgnoreRules.from_patterns(root_node.path, self.ignore_patterns))]
+        current_depth = 1
+        while current_level:
+            next_level: list[tuple[DirectoryNode, IgnoreRules]] = []
+            listings = map_function(self._list_directory, [node.path for node, _ in current_level])  # results are in the same order as the nodes
+            for (node, ignore_rules), entries in zip(current_level, listings):
+                node.entries = entries
+                if max_depth > 0 and current_depth >= max_depth:
+                    continue
+                next_level.extend(self._get_subdirectories_to_list(node, ignore_rules))
+            levels.append([node for node, _ in current_level])
+            current_level = next_level
+            current_depth += 1
+        return levels
+
+    def _get_subdirectories_to_list(self, node: DirectoryNode, ignore_rules: IgnoreRules) -> list[tuple[DirectoryNode, IgnoreRules]]:
+        if any(entry.name == constants.IGNORE_FILE_NAME and _is_file(entry) for entry in node.entries):
+            ignore_rules = ignore_rules.with_ignore_file(node.path)
+        subdirectories: list[tuple[DirectoryNode, IgnoreRules]] = []
+        for entry in node.entries:
+            if _is_file(entry) or not _is_dir(entry):
+                continue
+            if ignore_rules.is_ignored(entry.path):
+                logger.debug(f"ignoring {entry.path}")
+                self.ignored_directories.append(entry.path)
+                continue
+            child_node = DirectoryNode(entry.path)
+            node.subdirectories[entry.path] = child_node
+            subdirectories.append((child_node, ignore_rules))
+        return subdirectories
+
+    def _calculate_max_depth_with_audio_files(self, node: DirectoryNode):
+        max_depth_with_audio_files = -1
+        if any(_is_file(entry) and isFileFormatSupported(entry.name) for entry in node.entries):
+            max_depth_with_audio_files = 1
+        for child_node in node.subdirectories.values():
+            if child_node.max_depth_with_audio_files != -1:  # there is an audio file inside this entry
+                max_depth_with_audio_files = max(max_depth_with_audio_files, 1 + child_node.max_depth_with_audio_files)
+        node.max_depth_with_audio_files = max_depth_with_audio_files
+
+    def _list_directory(self, folder_path: str) -> list[os.DirEntry[str]]:
+        try:
+            with os.scandir(folder_path) as iterator:
+                return list(iterator)
+        except OSError as e:
+            logger.error(f"unable to list the folder at {folder_path}, error:\n{e}")
+            return []
+
+
+def _is_file(entry: os.DirEntry[str]) -> bool:
+    try:
+        return entry.is_file()
+    except OSError:
+        return False
+
+
+def _is_dir(entry: os.DirEntry[str]) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
@@ -1,14 +1,24 @@
+import contextlib
 import hashlib
+import json
 import os
 import re
 import sys
 import logging
-from typing import Any, Literal, Union, Optional
+import threading
+from typing import Any, Iterator, Literal, Union, Optional
 from math import ceil, log10
 from dotenv import load_dotenv
 
+try:
+    import orjson  # optional, decodes the big album responses several times faster than json
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
+_thread_state = threading.local()
+
 logging_levels = Literal["info", "debug", "error", "critical", "fatal"]
 
 
@@ -30,6 +40,29 @@ def get_default_logger(name: str, logging_level: logging_levels = "info") -> log
     return logger
 
 
+@contextlib.contextmanager
+def background_task() -> Iterator[None]:
+    """marks the work of the current thread as running in background (like prefetching), its messages are logged at debug level so they do not interrupt prompts"""
+    was_background_task = is_background_task()
+    _thread_state.is_background_task = True
+    try:
+        yield
+    finally:
+        _thread_state.is_background_task = was_background_task
+
+
+def is_background_task() -> bool:
+    return getattr(_thread_state, "is_background_task", False)
+
+
+def get_data_dir() -> str:
+    """directory for persistent data (caches, indexes, etc), created next to the logs directory if it does not exist"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.abspath(os.path.join(script_dir, "..", "data"))
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
 logger = get_default_logger(__name__, "info")
 
 
@@ -122,6 +155,23 @@ def getSha256(filePath: str, block_size: int = 8192) -> str:
     return sha256Hash.hexdigest()
 
 
+def parse_json(data: bytes | str) -> Any:
+    """json.loads, using orjson if it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def get_peak_memory_usage_mb() -> float | None:
+    """high water mark of the resident memory of this process, None if it cannot be determined on this platform"""
+    try:
+        import resource
+    except ImportError:  # not available on windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024  # bytes on macOS, kilobytes on linux
+
+
 def to_sentence_case(input_string: str) -> str:
     do_not_capitalize = ("a", "an", "the", "and", "but", "or", "for", "nor", "on", "at", "to", "by", "of", "in", "is", "are")
     words = input_string.split()
@@ -161,7 +211,7 @@ def is_date_in_YYYY_MM_DD(date: str) -> bool:
     if not date:
         return False
     pattern = re.compile(r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[1-2][0-9]|3[0-1])$")
-    return bool(pattern.match(date[0]))
+    return bool(pattern.match(date))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+"""
+thread safe in-memory cache bounded by number of entries and (optionally) total size in bytes, the least recently used entries are evicted first
+an entry bigger than max_size_bytes on its own is not cached at all
+"""
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LruCache(Generic[K, V]):
+    def __init__(self, max_entries: int, max_size_bytes: int | None = None, get_size: Callable[[V], int] | None = None):
+        """get_size returns the size of a value in bytes, required if max_size_bytes is provided"""
+        if max_size_bytes is not None and get_size is None:
+            raise ValueError("get_size is required for limiting the size of the cache")
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_bytes
+        self.get_size = get_size
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[K, tuple[V, int]] = OrderedDict()  # key -> (value, size)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> V | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: K, value: V):
+        size = self.get_size(value) if self.get_size else 0
+        with self.lock:
+            self._remove(key)
+            if self.max_size_bytes is not None and size > self.max_size_bytes:
+                return
+            self.entries[key] = (value, size)
+            self.size_bytes += size
+            while len(self.entries) > self.max_entries or (self.max_size_bytes is not None and self.size_bytes > self.max_size_bytes):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+
+    def peek(self, key: K) -> V | None:
+        """get without counting a hit or miss, and without marking the entry as recently used"""
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def pprint_statistics(self) -> str:
+        size = f", {self.size_bytes / (1024 * 1024):.1f} MB" if self.get_size else ""
+        return f"{len(self.entries)} entries{size}, {self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+
+    # private functions
+    def _remove(self, key: K):
+        """must be called with the lock held"""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[1]
@@ -1,7 +1,62 @@
 import os
 import requests
+from typing import Any
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
-import urllib.request
+
+from Imports.constants import HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_READ_TIMEOUT_SECONDS
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class HttpTransport:
+    """
+    shared http layer, every request goes through one requests.Session so that connections (and TLS sessions) are kept alive and reused per host
+    requests without an explicit timeout get the default (connect, read) timeouts
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = HTTP_READ_TIMEOUT_SECONDS,
+        pool_connections: int = HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.session = requests.Session()
+        self.mount(self.session)
+
+    def mount(self, session: requests.Session):
+        """use the pool settings of this transport for another session (like the logged in session of vgmdbrip)"""
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, session: requests.Session | None = None, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return (session if session else self.session).request(method, url, **kwargs)
+
+    def get(self, url: str, session: requests.Session | None = None, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, session, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_http_transport = HttpTransport()
+
+
+def get_http_transport() -> HttpTransport:
+    return _http_transport
+
+
+def configure_http_transport(connect_timeout: float, read_timeout: float, pool_maxsize: int):
+    """replaces the shared transport, meant to be called once at startup"""
+    global _http_transport
+    _http_transport.close()
+    _http_transport = HttpTransport(connect_timeout=connect_timeout, read_timeout=read_timeout, pool_maxsize=pool_maxsize)
 
 
 def get_raw_data_from_url(url: str) -> bytes:
@@ -13,7 +68,7 @@ def get_raw_data_from_url(url: str) -> bytes:
     Returns:
         bytes: raw data received from the url
     """
-    response = requests.get(url)
+    response = get_http_transport().get(url)
     return response.content
 
 
@@ -49,7 +104,16 @@ def download_file(url: str, output_dir: str, name: str | None = None) -> str:
     if os.path.exists(filePath):
         raise FileExistsError(f"file already exists: {fileName}")  # logging fileName in error instead of filePath to reduce clutter in Console
 
-    urllib.request.urlretrieve(url, filePath)
+    with get_http_transport().get(url, stream=True) as response:
+        response.raise_for_status()
+        try:
+            with open(filePath, "wb") as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+        except BaseException:
+            if os.path.exists(filePath):
+                os.remove(filePath)  # not leaving partially downloaded files behind
+            raise
     return filePath
 
 
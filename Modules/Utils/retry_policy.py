@@ -0,0 +1,96 @@
+import email.utils
+import random
+import threading
+import time
+from typing import Literal
+
+"""
+building blocks for retrying http requests predictably
+    * RetryPolicy decides whether a failed attempt is retried and how long to wait before the next one:
+      exponential backoff with full jitter (so that parallel workers do not retry in lockstep), capped at max_delay,
+      and the Retry-After header of 429/503 responses is honoured (capped at max_retry_after)
+    * CircuitBreaker fails fast once a host keeps failing, instead of every request waiting through all of its retries.
+      after reset_timeout a single trial request is let through, which closes the circuit again if it gets a response.
+      if the trial never reports back, another one is let through after reset_timeout
+"""
+
+CIRCUIT_STATES = Literal["closed", "open", "half-open"]
+
+
+class CircuitOpenException(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+class RetryPolicy:
+    RETRYABLE_STATUS_CODES = frozenset([408, 425, 429, 500, 502, 503, 504])
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float, max_retry_after: float, timeout: tuple[float, float] | None = None):
+        """timeout is the (connect, read) timeout of every attempt, None uses the default timeout of the http transport"""
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """404 and other client errors will not change by asking again"""
+        return status_code in self.RETRYABLE_STATUS_CODES
+
+    def get_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """seconds to wait after the failed attempt (starting from 1), retry_after is the Retry-After header of the response if any"""
+        retry_after_seconds = self._parse_retry_after(retry_after)
+        if retry_after_seconds is not None:
+            return min(retry_after_seconds, self.max_retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    # private functions
+    def _parse_retry_after(self, retry_after: str | None) -> float | None:
+        """Retry-After is either a number of seconds or an http date"""
+        if not retry_after:
+            return None
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state: CIRCUIT_STATES = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                self.opened_at = time.monotonic()  # the next trial is let through only after another reset_timeout
+                return True  # the trial request
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == "half-open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def get_retry_in(self) -> float:
+        """seconds after which a trial request will be let through"""
+        with self.lock:
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)) if self.state != "closed" else 0.0
@@ -0,0 +1,88 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Literal
+
+from Modules.Utils.general_utils import get_data_dir
+from Modules.VGMDB import constants
+
+"""
+persistent map from catalog numbers and barcodes to vgmdb album ids, filled from every album and search result seen by VgmdbClient
+albums whose catalog or barcode maps to exactly one album id can be tagged without searching (and without asking the user to choose)
+values are normalized so that tags written by hand still match:
+    * catalog: uppercase alphanumerics only, ranges are also indexed by their first catalog (KSLA-0076~8 -> KSLA00768, KSLA0076)
+    * barcode: digits only without leading zeros (UPC-A and the equivalent EAN-13 match)
+"""
+
+INDEX_KINDS = Literal["catalog", "barcode"]
+
+_CATALOG_RANGE_SEPARATORS = re.compile(r"[~〜]")
+
+
+def normalize_catalog(catalog: str | None) -> list[str]:
+    if not catalog or catalog.strip().upper() in ["N/A", "NA", "NONE"]:
+        return []
+    normalized_catalogs: list[str] = []
+    for value in [catalog, _CATALOG_RANGE_SEPARATORS.split(catalog)[0]]:
+        normalized_catalog = re.sub(r"[^0-9A-Z]", "", value.upper())
+        if normalized_catalog and normalized_catalog not in normalized_catalogs:
+            normalized_catalogs.append(normalized_catalog)
+    return normalized_catalogs
+
+
+def normalize_barcode(barcode: str | None) -> list[str]:
+    normalized_barcode = re.sub(r"\D", "", barcode).lstrip("0") if barcode else ""
+    return [normalized_barcode] if len(normalized_barcode) >= constants.ALBUM_ID_INDEX_MIN_BARCODE_DIGITS else []
+
+
+class AlbumIdIndex:
+    def __init__(self, database_path: str | None = None):
+        self.database_path = database_path if database_path else os.path.join(get_data_dir(), constants.ALBUM_ID_INDEX_FILE_NAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS album_ids (
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    album_id TEXT NOT NULL,
+                    PRIMARY KEY (kind, value, album_id)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def add(self, albums: list[tuple[str, str | None, str | None]]):
+        """albums is a list of (album_id, catalog, barcode)"""
+        rows: list[tuple[str, str, str]] = []
+        for album_id, catalog, barcode in albums:
+            rows.extend(("catalog", value, album_id) for value in normalize_catalog(catalog))
+            rows.extend(("barcode", value, album_id) for value in normalize_barcode(barcode))
+        if not rows:
+            return
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO album_ids (kind, value, album_id) VALUES (?, ?, ?)", rows)
+
+    def get_album_ids(self, kind: INDEX_KINDS, value: str | None) -> set[str]:
+        normalized_values = normalize_catalog(value) if kind == "catalog" else normalize_barcode(value)
+        if not normalized_values:
+            return set()
+        with self.lock:
+            rows = self.connection.execute("SELECT album_id FROM album_ids WHERE kind = ? AND value = ?", (kind, normalized_values[0])).fetchall()
+        return {album_id for (album_id,) in rows}
+
+    def find_album_id(self, catalog: str | None, barcode: str | None) -> str | None:
+        """returns the album id only if it is unambiguous, catalog and barcode must not point to different albums"""
+        album_ids: set[str] = set()
+        for kind, value in [("catalog", catalog), ("barcode", barcode)]:
+            album_ids_of_value = self.get_album_ids(kind, value)  # type: ignore
+            if len(album_ids_of_value) > 1:
+                return None
+            album_ids |= album_ids_of_value
+        return album_ids.pop() if len(album_ids) == 1 else None
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,69 @@
+import asyncio
+import concurrent.futures
+from typing import Awaitable, Callable, TypeVar
+
+from Modules.Utils.general_utils import get_default_logger
+from Modules.VGMDB.api.client import VgmdbClient
+from Modules.VGMDB.constants import VGMDB_MAX_CONCURRENT_REQUESTS
+from Modules.VGMDB.models.search import SearchAlbum
+from Modules.VGMDB.models.vgmdb_album_data import VgmdbAlbumData
+
+"""
+asyncio counterpart of VgmdbClient for fetching many albums (or searches) together
+    * every call is run by the wrapped VgmdbClient in a worker thread, so the semantics and caches (in memory and on disk) are shared with it
+    * at most max_concurrency requests are in flight at once, the per host rate limit is applied by the rate_limiter of the wrapped client
+    * batch functions return the result or the exception for every input, one failed album does not fail the whole batch
+"""
+
+logger = get_default_logger(__name__, "info")
+
+T = TypeVar("T")
+
+
+class AsyncVgmdbClient:
+    def __init__(self, client: VgmdbClient, max_concurrency: int = VGMDB_MAX_CONCURRENT_REQUESTS):
+        self.client = client
+        self.max_concurrency = max(1, max_concurrency)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="vgmdb")
+        self.semaphore: asyncio.Semaphore | None = None  # created lazily inside the running event loop
+
+    async def get_album_details(self, album_id: str) -> VgmdbAlbumData:
+        return await self._run(self.client.get_album_details, album_id)
+
+    async def search_album(self, search_term: str | None) -> list[SearchAlbum]:
+        return await self._run(self.client.search_album, search_term)
+
+    async def get_albums_details(self, album_ids: list[str]) -> dict[str, VgmdbAlbumData | Exception]:
+        return await self._gather(self.get_album_details, album_ids)
+
+    async def search_albums(self, search_terms: list[str]) -> dict[str, list[SearchAlbum] | Exception]:
+        return await self._gather(self.search_album, search_terms)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    # private functions
+    async def _run(self, function: Callable[[str], T], argument: str | None) -> T:
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, argument)
+
+    async def _gather(self, function: Callable[[str], Awaitable[T]], keys: list[str]) -> dict[str, T | Exception]:
+        unique_keys = list(dict.fromkeys(keys))
+        results = await asyncio.gather(*[function(key) for key in unique_keys], return_exceptions=True)
+        for key, result in zip(unique_keys, results):
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result  # KeyboardInterrupt, CancelledError, etc
+            if isinstance(result, Exception):
+                logger.debug(f"could not fetch {key}, error: {result}")
+        return dict(zip(unique_keys, results))  # type: ignore
+
+
+def prefetch_album_details(client: VgmdbClient, album_ids: list[str], max_concurrency: int = VGMDB_MAX_CONCURRENT_REQUESTS) -> dict[str, VgmdbAlbumData | Exception]:
+    """fetches the details of all album_ids concurrently into the caches of client, for callers which are not async"""
+    async_client = AsyncVgmdbClient(client, max_concurrency)
+    try:
+        return asyncio.run(async_client.get_albums_details(album_ids))
+    finally:
+        async_client.close()
@@ -1,8 +1,10 @@
+import contextlib
 import textwrap
+import threading
 import traceback
 import requests
 import time
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import urljoin
 
 # REMOVE
@@ -12,13 +14,33 @@ import sys
 sys.path.append(os.getcwd())
 # REMOVE
 
-from Modules.VGMDB.constants import APICALLRETRIES, USE_LOCAL_SERVER, VGMDB_INFO_BASE_URL
+from Modules.VGMDB.api.album_id_index import AlbumIdIndex
+from Modules.VGMDB.api.offline_mirror import OfflineMirror
+from Modules.VGMDB.api.rate_limiter import HostRateLimiter
+from Modules.VGMDB.api.response_cache import ResponseCache
+from Modules.VGMDB.constants import (
+    ALBUM_CACHE_MAX_ENTRIES,
+    APICALLRETRIES,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RESET_SECONDS,
+    RETRY_AFTER_MAX_SECONDS,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_DELAY_SECONDS,
+    SEARCH_CACHE_MAX_ENTRIES,
+    USE_LOCAL_SERVER,
+    VGMDB_INFO_BASE_URL,
+)
 from Modules.Print.utils import get_panel, get_rich_console
-from Modules.VGMDB.models.vgmdb_album_data import VgmdbAlbumData
+from Modules.Utils.general_utils import get_default_logger, is_background_task, parse_json
+from Modules.Utils.lru_cache import LruCache
+from Modules.Utils.network_utils import get_http_transport
+from Modules.Utils.retry_policy import CircuitBreaker, CircuitOpenException, RetryPolicy
+from Modules.VGMDB.models.vgmdb_album_data import VgmdbAlbumData, album_cover_cache
 from Modules.VGMDB.models.search import SearchAlbum
 
 
 console = get_rich_console()
+logger = get_default_logger(__name__, "info")
 
 
 class VgmdbRequestException(requests.RequestException):
@@ -27,9 +49,37 @@ class VgmdbRequestException(requests.RequestException):
 
 
 class VgmdbClient:
-    def __init__(self) -> None:
-        self.vgmdb_info_base_url = VGMDB_INFO_BASE_URL
-        if USE_LOCAL_SERVER:
+    def __init__(
+        self,
+        response_cache: ResponseCache | None = None,
+        refresh: bool = False,
+        rate_limiter: HostRateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        offline_mirror: OfflineMirror | None = None,
+        album_id_index: AlbumIdIndex | None = None,
+        base_url: str | None = None,
+    ) -> None:
+        """
+        response_cache keeps the responses on disk across runs
+        refresh ignores the cached responses (they are still updated with the fresh responses)
+        rate_limiter spaces out the requests when the client is used from multiple threads (see AsyncVgmdbClient)
+        retry_policy and circuit_breaker default to the values in Modules/VGMDB/constants.py, the default timeouts are those of the http transport
+        offline_mirror serves all the data locally, no server is started and no request is sent
+        album_id_index is filled with the catalog and barcode of every album seen, see find_album_id
+        base_url of the vgmdb.info api, no server is started if it is provided (used for replaying recorded responses)
+        """
+        self.response_cache = response_cache
+        self.refresh = refresh
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy(APICALLRETRIES, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS, RETRY_AFTER_MAX_SECONDS)
+        self.circuit_breaker = circuit_breaker if circuit_breaker else CircuitBreaker(CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_RESET_SECONDS)
+        self.offline_mirror = offline_mirror
+        self.album_id_index = album_id_index
+        self.vgmdb_info_base_url = base_url if base_url else VGMDB_INFO_BASE_URL
+        if offline_mirror:
+            console.print(get_panel(f"[bold yellow]Using offline mirror [blue]{offline_mirror.database_path}[/] ({offline_mirror.get_album_count()} albums) for VGMDB API"))
+        elif USE_LOCAL_SERVER and not base_url:
             try:
                 from Modules.VGMDB.api.vgmdb_info import run_vgmdb_info_server
 
@@ -63,56 +113,151 @@ class VgmdbClient:
                         ).strip()
                     )
                 )
-        console.print(get_panel(f"[bold yellow]Using [blue]{self.vgmdb_info_base_url}[/] for VGMDB API"))
+        if not offline_mirror:
+            console.print(get_panel(f"[bold yellow]Using [blue]{self.vgmdb_info_base_url}[/] for VGMDB API"))
 
-        self.album_cache: dict[str, VgmdbAlbumData] = {}
-        self.search_cache: dict[str, list[SearchAlbum]] = {}
+        self.album_cache: LruCache[str, VgmdbAlbumData] = LruCache(ALBUM_CACHE_MAX_ENTRIES)
+        self.search_cache: LruCache[str, list[SearchAlbum]] = LruCache(SEARCH_CACHE_MAX_ENTRIES)
+        # the client is shared with background threads (AsyncVgmdbClient, AlbumPrefetcher), so a key is fetched by only one of them at a time
+        self.locks_lock = threading.Lock()
+        self.key_locks: dict[tuple[str, str], threading.Lock] = {}
+        self.key_lock_users: dict[tuple[str, str], int] = {}  # locks are removed once unused, so that they do not outlive the bounded caches
 
     def get_request(self, url: str) -> dict[str, Any] | Exception:
-        backoff_secs = 1
-        found_exception = Exception("empty exception")
+        """
+        returns the json response, or the exception of the last attempt if the request failed
+        server errors, 429, timeouts and connection errors are retried according to retry_policy, other client errors (like 404) are not
+        """
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Accept": "application/json, text/javascript, */*; q=0.01",
         }
-        for _ in range(APICALLRETRIES):
+        found_exception: Exception = Exception("empty exception")
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            if not self.circuit_breaker.allow_request():
+                return CircuitOpenException(f"vgmdb api is failing, not sending requests for {self.circuit_breaker.get_retry_in():.0f} seconds")
+            retry_after: str | None = None
             try:
-                response = requests.get(url, headers=headers)
-                if response.status_code >= 200 and response.status_code <= 299:
-                    return response.json()
+                if self.rate_limiter:
+                    self.rate_limiter.wait(url)
+                http_transport = get_http_transport()
+                response = http_transport.get(url, headers=headers, timeout=self.retry_policy.timeout or http_transport.timeout)
+                if 200 <= response.status_code <= 299:
+                    json_response = parse_json(response.content)
+                    self.circuit_breaker.record_success()
+                    return json_response
+                found_exception = requests.HTTPError(f"{response.status_code} {response.reason} for {url}", response=response)
+                if not self.retry_policy.is_retryable_status(response.status_code):
+                    self.circuit_breaker.record_success()  # the api is up, the request itself is wrong
+                    return found_exception
+                if response.status_code == 429:
+                    self.circuit_breaker.record_success()  # being rate limited does not mean the api is down, it responded
+                else:
+                    self.circuit_breaker.record_failure()
+                retry_after = response.headers.get("Retry-After")
             except Exception as e:
-                console.log(f"[red]error in getting response, retrying after {backoff_secs} seconds")
-                console.log(f"[red]error: {e}")
+                self.circuit_breaker.record_failure()
                 found_exception = e
-                time.sleep(backoff_secs)
-                backoff_secs *= 2
+            if attempt == self.retry_policy.max_attempts:
+                break
+            delay = self.retry_policy.get_delay(attempt, retry_after)
+            if is_background_task():
+                logger.debug(f"error in getting response, retrying after {delay:.1f} seconds, error: {found_exception}")
+            else:
+                console.log(f"[red]error in getting response, retrying after {delay:.1f} seconds")
+                console.log(f"[red]error: {found_exception}")
+            time.sleep(delay)
         return found_exception
 
     def get_album_details(self, album_id: str) -> VgmdbAlbumData:
-        if album_id in self.album_cache:
-            return self.album_cache[album_id]
+        cached_album_data = self.album_cache.get(album_id)
+        if cached_album_data is not None:
+            return cached_album_data
 
-        url = urljoin(self.vgmdb_info_base_url, f"album/{album_id}")
-        vgmdb_album_data = self.get_request(url)
-        if isinstance(vgmdb_album_data, Exception):
-            raise VgmdbRequestException(f"could not retrieve album details from vgmdb for albumID: {album_id}")
+        with self._lock_key("album", album_id):
+            cached_album_data = self.album_cache.peek(album_id)
+            if cached_album_data is not None:  # fetched by another thread while waiting for the lock
+                return cached_album_data
+            if self.offline_mirror:
+                vgmdb_album_data = self.offline_mirror.get_album(album_id)
+                if vgmdb_album_data is None:
+                    raise VgmdbRequestException(f"album with albumID: {album_id} is not present in the offline mirror")
+                vgmdb_album_data["picture_full"] = None  # covers are not part of the mirror, nothing is downloaded in offline mode
+            else:
+                vgmdb_album_data = self._get_cached_response("album", album_id)
+            if vgmdb_album_data is None:
+                url = urljoin(self.vgmdb_info_base_url, f"album/{album_id}")
+                vgmdb_album_data = self.get_request(url)
+                if isinstance(vgmdb_album_data, Exception):
+                    raise VgmdbRequestException(f"could not retrieve album details from vgmdb for albumID: {album_id}")
+                self._cache_response("album", album_id, vgmdb_album_data)
 
-        self.album_cache[album_id] = VgmdbAlbumData(**vgmdb_album_data, album_id=album_id)
-        return self.album_cache[album_id]
+            album_data = VgmdbAlbumData(**vgmdb_album_data, album_id=album_id)
+            self.album_cache.set(album_id, album_data)
+            if self.album_id_index:
+                self.album_id_index.add([(album_id, album_data.catalog, album_data.barcode)])
+            return album_data
 
     def search_album(self, search_term: str | None) -> list[SearchAlbum]:
         if not search_term:
             search_term = ""
         cleaned_search_term = self._clean_search_term(search_term)
-        if cleaned_search_term in self.search_cache:
-            return self.search_cache[cleaned_search_term]
-
-        url = urljoin(self.vgmdb_info_base_url, f"search?q={cleaned_search_term}")
-        search_result = self.get_request(url)
-        if isinstance(search_result, Exception):
-            raise VgmdbRequestException(f"could not search for {cleaned_search_term} from vgmdb")
-        self.search_cache[cleaned_search_term] = [SearchAlbum.model_validate(result) for result in search_result["results"]["albums"]]
-        return self.search_cache[cleaned_search_term]
+        cached_search_albums = self.search_cache.get(cleaned_search_term)
+        if cached_search_albums is not None:
+            return cached_search_albums
+
+        with self._lock_key("search", cleaned_search_term):
+            cached_search_albums = self.search_cache.peek(cleaned_search_term)
+            if cached_search_albums is not None:
+                return cached_search_albums
+            if self.offline_mirror:
+                search_albums = self.offline_mirror.search(cleaned_search_term)
+            else:
+                search_albums = self._get_cached_response("search", cleaned_search_term)
+            if search_albums is None:
+                url = urljoin(self.vgmdb_info_base_url, f"search?q={cleaned_search_term}")
+                search_result = self.get_request(url)
+                if isinstance(search_result, Exception):
+                    raise VgmdbRequestException(f"could not search for {cleaned_search_term} from vgmdb")
+                search_albums = search_result["results"]["albums"]
+                self._cache_response("search", cleaned_search_term, search_albums)
+            search_result_albums = [SearchAlbum.model_validate(result) for result in search_albums]
+            self.search_cache.set(cleaned_search_term, search_result_albums)
+            if self.album_id_index:
+                self.album_id_index.add([(search_album.album_id, search_album.catalog, None) for search_album in search_result_albums])
+            return search_result_albums
+
+    def pprint_cache_statistics(self) -> str:
+        return f"albums: {self.album_cache.pprint_statistics()} | searches: {self.search_cache.pprint_statistics()} | covers: {album_cover_cache.pprint_statistics()}"
+
+    def find_album_id(self, catalog: str | None, barcode: str | None) -> str | None:
+        """album id of the only album known to have this catalog or barcode, None if there is no such album (or more than one)"""
+        return self.album_id_index.find_album_id(catalog, barcode) if self.album_id_index else None
+
+    @contextlib.contextmanager
+    def _lock_key(self, endpoint: str, key: str) -> Iterator[None]:
+        lock_key = (endpoint, key)
+        with self.locks_lock:
+            key_lock = self.key_locks.setdefault(lock_key, threading.Lock())
+            self.key_lock_users[lock_key] = self.key_lock_users.get(lock_key, 0) + 1
+        try:
+            with key_lock:
+                yield
+        finally:
+            with self.locks_lock:
+                self.key_lock_users[lock_key] -= 1
+                if not self.key_lock_users[lock_key]:
+                    del self.key_lock_users[lock_key]
+                    del self.key_locks[lock_key]
+
+    def _get_cached_response(self, endpoint: str, key: str) -> Any | None:
+        if not self.response_cache or self.refresh:
+            return None
+        return self.response_cache.get(endpoint, key)
+
+    def _cache_response(self, endpoint: str, key: str, response: Any):
+        if self.response_cache:
+            self.response_cache.set(endpoint, key, response)
 
     def _clean_search_term(self, name: str) -> str:
         def isJapanese(ch: str) -> bool:
@@ -0,0 +1,126 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Any
+
+from Modules.Utils.general_utils import get_data_dir, get_default_logger, parse_json
+from Modules.VGMDB import constants
+
+"""
+local copy of vgmdb album data, for tagging without vgmdb.info (or the docker server running it)
+    * album json documents (the response of vgmdb.info/album/{id}) are imported into sqlite, stored zlib compressed
+    * titles in every language, catalog and barcode are indexed using FTS5 (with prefix indexes), search results are ranked by bm25
+    * search results are returned in the shape of vgmdb.info/search results, so VgmdbClient parses them as usual
+"""
+
+logger = get_default_logger(__name__, "info")
+
+_ALBUM_ID_FROM_LINK = re.compile(r"album/(\d+)")
+
+
+class OfflineMirror:
+    def __init__(self, database_path: str | None = None):
+        self.database_path = database_path if database_path else os.path.join(get_data_dir(), constants.OFFLINE_MIRROR_FILE_NAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")  # the mirror can always be imported again, no need to sync every imported album
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS albums (
+                    album_id TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    search_result TEXT NOT NULL
+                )
+                """
+            )
+            self.connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS album_search USING fts5(album_id UNINDEXED, titles, catalog, barcode, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')")
+
+    def import_album(self, album: dict[str, Any], album_id: str | None = None):
+        """album is the json response of vgmdb.info/album/{id}, album_id is taken from its link if not provided"""
+        album_id = album_id if album_id else self._get_album_id(album)
+        if not album_id:
+            raise ValueError(f"album id not provided and not found in the link of album: {album.get('name')}")
+        titles = album.get("names") or {"en": album.get("name", "")}
+        catalog = album.get("catalog") or "N/A"
+        barcode = album.get("barcode") or ""
+        search_result = {
+            "catalog": catalog,
+            "link": f"album/{album_id}",
+            "release_date": album.get("release_date") or "",
+            "titles": titles,
+            "media_format": album.get("media_format"),
+            "category": album.get("category") or album.get("classification"),
+        }
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO albums (album_id, payload, search_result) VALUES (?, ?, ?)",
+                (album_id, zlib.compress(json.dumps(album, ensure_ascii=False).encode("utf-8")), json.dumps(search_result, ensure_ascii=False)),
+            )
+            self.connection.execute("DELETE FROM album_search WHERE album_id = ?", (album_id,))
+            self.connection.execute(
+                "INSERT INTO album_search (album_id, titles, catalog, barcode) VALUES (?, ?, ?, ?)",
+                (album_id, " ".join(str(title) for title in titles.values()), catalog if catalog != "N/A" else "", barcode),
+            )
+
+    def import_folder(self, folder_path: str) -> int:
+        """imports every *.json album document in folder_path recursively (file name is used as album id if the link is missing), returns the number of albums imported"""
+        imported_albums = 0
+        for directory, _, file_names in os.walk(folder_path):
+            for file_name in file_names:
+                name, extension = os.path.splitext(file_name)
+                if extension.lower() != ".json":
+                    continue
+                file_path = os.path.join(directory, file_name)
+                try:
+                    with open(file_path, encoding="utf-8") as file:
+                        album = json.load(file)
+                    self.import_album(album, self._get_album_id(album) or (name if name.isdigit() else None))
+                    imported_albums += 1
+                except (OSError, ValueError) as e:
+                    logger.error(f"could not import {file_path} into the offline mirror, error: {e}")
+        return imported_albums
+
+    def get_album(self, album_id: str) -> dict[str, Any] | None:
+        with self.lock:
+            row = self.connection.execute("SELECT payload FROM albums WHERE album_id = ?", (album_id,)).fetchone()
+        return parse_json(zlib.decompress(row[0])) if row else None
+
+    def search(self, search_term: str, limit: int = constants.OFFLINE_MIRROR_SEARCH_LIMIT) -> list[dict[str, Any]]:
+        """every word of search_term must match (as a prefix) a word of the titles, catalog or barcode"""
+        words = re.findall(r"\w+", search_term)
+        if not words:
+            return []
+        query = " AND ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+        with self.lock:
+            rows = self.connection.execute(
+                """
+                SELECT albums.search_result
+                FROM (SELECT album_id, rank FROM album_search WHERE album_search MATCH ? ORDER BY rank LIMIT ?) AS matches
+                JOIN albums ON albums.album_id = matches.album_id
+                ORDER BY matches.rank
+                """,
+                (query, limit),
+            ).fetchall()
+        return [parse_json(search_result) for (search_result,) in rows]
+
+    def get_album_count(self) -> int:
+        with self.lock:
+            (album_count,) = self.connection.execute("SELECT COUNT(*) FROM albums").fetchone()
+        return album_count
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    # private functions
+    def _get_album_id(self, album: dict[str, Any]) -> str | None:
+        for link_key in ["link", "vgmdb_link"]:
+            match = _ALBUM_ID_FROM_LINK.search(str(album.get(link_key, "")))
+            if match:
+                return match.group(1)
+        return None
@@ -0,0 +1,40 @@
+import concurrent.futures
+
+from Modules.Utils.general_utils import background_task, get_default_logger
+from Modules.VGMDB.api.client import VgmdbClient
+from Modules.VGMDB.constants import PREFETCH_NUM_THREADS
+
+"""
+warms the caches of VgmdbClient for the upcoming albums in background, while the user is reviewing the current album
+    * albums with an embedded album id get their details fetched (which also starts downloading the album cover, see VgmdbAlbumData.model_post_init)
+    * other albums get their search results fetched, and the details too if the search returns exactly one album
+failures (and other messages) are only logged at debug level, the album is fetched again (and the error reported) when it is actually operated on
+"""
+
+logger = get_default_logger(__name__, "info")
+
+
+class AlbumPrefetcher:
+    def __init__(self, client: VgmdbClient, num_threads: int = PREFETCH_NUM_THREADS):
+        self.client = client
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, num_threads), thread_name_prefix="prefetch")
+
+    def prefetch(self, album_id: str | None, search_term: str | None) -> concurrent.futures.Future[None]:
+        return self.executor.submit(self._prefetch, album_id, search_term)
+
+    def close(self):
+        """pending prefetches are cancelled, running ones are not waited for"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # private functions
+    def _prefetch(self, album_id: str | None, search_term: str | None):
+        try:
+            with background_task():
+                if not album_id and search_term:
+                    search_albums = self.client.search_album(search_term)
+                    if len(search_albums) == 1:
+                        album_id = search_albums[0].album_id
+                if album_id:
+                    self.client.get_album_details(album_id)
+        except Exception as e:
+            logger.debug(f"could not prefetch album id: {album_id}, search term: {search_term}, error: {e}")
@@ -0,0 +1,27 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+"""
+spaces out the requests sent to every host, so that parallel fetching does not hammer vgmdb.info
+the limiter is thread safe, every caller reserves the next free slot of the host and then sleeps (outside the lock) till its slot arrives
+"""
+
+
+class HostRateLimiter:
+    def __init__(self, requests_per_second: float | None):
+        """requests_per_second = None (or <= 0) disables the limit"""
+        self.interval = 1 / requests_per_second if requests_per_second and requests_per_second > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot_of_host: dict[str, float] = {}
+
+    def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot_of_host.get(host, now))
+            self.next_slot_of_host[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
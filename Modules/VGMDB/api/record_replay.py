@@ -0,0 +1,158 @@
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import quote, unquote, urlsplit
+
+import requests
+
+from Modules.Utils.general_utils import get_default_logger
+
+"""
+record/replay stand-in for vgmdb.info (and the hosts serving covers and scans), for testing and benchmarking without network
+    * ResponseRecorder saves every response received through a requests session into a fixture folder: {fixture_dir}/{host}/{path?query}
+      the body is saved as it is, status and content type go into a .meta.json file next to it
+    * ReplayServer serves a fixture folder over http on localhost: {base_url}/{host}/{path?query} returns the recorded response of https://{host}/{path?query}
+      links to recorded hosts inside json responses (like picture_full) are rewritten to point to the server as well
+      latency and errors (with their status code) can be injected for load testing retries and concurrency
+"""
+
+logger = get_default_logger(__name__, "info")
+
+_META_SUFFIX = ".meta.json"
+
+
+def get_fixture_path(fixture_dir: str, url: str) -> str:
+    """the host is a folder and the rest of the url is quoted into a single file name inside it, raises ValueError if either would point outside fixture_dir"""
+    parsed_url = urlsplit(url)
+    key = unquote(parsed_url.path.lstrip("/") + (f"?{parsed_url.query}" if parsed_url.query else ""))
+    file_name = quote(key, safe=" ") or "index"
+    for path_component in (parsed_url.netloc, file_name):
+        if not path_component or path_component in (".", "..") or "/" in path_component or os.sep in path_component:
+            raise ValueError(f"{url} can not be stored as a fixture")
+    return os.path.join(fixture_dir, parsed_url.netloc, file_name)
+
+
+def save_fixture(fixture_dir: str, url: str, body: bytes, status_code: int = 200, content_type: str = "application/json"):
+    fixture_path = get_fixture_path(fixture_dir, url)
+    os.makedirs(os.path.dirname(fixture_path), exist_ok=True)
+    with open(fixture_path, "wb") as body_file:
+        body_file.write(body)
+    with open(fixture_path + _META_SUFFIX, "w") as meta_file:
+        json.dump({"url": url, "status_code": status_code, "content_type": content_type}, meta_file)
+
+
+class ResponseRecorder:
+    def __init__(self, fixture_dir: str, host_aliases: dict[str, str] | None = None):
+        """host_aliases records the responses of a host as if they came from another one, like the local vgmdb.info server (localhost:5020) as vgmdb.info"""
+        self.fixture_dir = fixture_dir
+        self.host_aliases = host_aliases if host_aliases else {}
+        self.recorded_responses = 0
+
+    def attach(self, session: requests.Session):
+        """records every response received through session from now on"""
+        session.hooks["response"].append(self._record)
+
+    # private functions
+    def _record(self, response: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+        if response.status_code >= 500:
+            return response  # transient errors are not worth replaying
+        parsed_url = urlsplit(response.url)
+        url = parsed_url._replace(scheme="https", netloc=self.host_aliases[parsed_url.netloc]).geturl() if parsed_url.netloc in self.host_aliases else response.url
+        try:
+            save_fixture(self.fixture_dir, url, response.content, response.status_code, response.headers.get("Content-Type", "application/octet-stream"))
+        except ValueError as e:
+            logger.debug(f"not recording {response.url}, error: {e}")
+            return response
+        self.recorded_responses += 1
+        logger.debug(f"recorded {response.url}")
+        return response
+
+
+class ReplayServer:
+    def __init__(self, fixture_dir: str, latency_seconds: float = 0.0, error_rate: float = 0.0, error_status: int = 503, seed: int | None = None):
+        """error_rate is the fraction of requests answered with error_status instead of the recorded response"""
+        self.fixture_dir = fixture_dir
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.served_requests = 0
+        self.injected_errors = 0
+        self.missing_fixtures = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._get_handler_class())
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> str:
+        """starts serving in a background thread, returns the base url"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.debug(f"replaying {self.fixture_dir} at {self.base_url}")
+        return self.base_url
+
+    def get_url(self, original_url: str) -> str:
+        """url of the server replaying original_url, like https://vgmdb.info/ -> {base_url}/vgmdb.info/"""
+        parsed_url = urlsplit(original_url)
+        return f"{self.base_url}/{parsed_url.netloc}{parsed_url.path}" + (f"?{parsed_url.query}" if parsed_url.query else "")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def pprint_statistics(self) -> str:
+        return f"{self.served_requests} requests, {self.injected_errors} injected errors, {self.missing_fixtures} missing fixtures"
+
+    # private functions
+    def _get_response(self, request_path: str) -> tuple[int, str, bytes]:
+        """(status code, content type, body) for the path of a request received by the server"""
+        host, _, path = request_path.lstrip("/").partition("/")
+        try:
+            fixture_path = get_fixture_path(self.fixture_dir, f"https://{host}/{path}")
+        except ValueError:
+            return 400, "text/plain", b"invalid path"
+        with self.lock:
+            self.served_requests += 1
+            inject_error = self.random.random() < self.error_rate
+            if inject_error:
+                self.injected_errors += 1
+        if inject_error:
+            return self.error_status, "text/plain", b"injected error"
+        if not os.path.isfile(fixture_path + _META_SUFFIX):
+            with self.lock:
+                self.missing_fixtures += 1
+            return 404, "text/plain", b"not recorded"
+        with open(fixture_path + _META_SUFFIX) as meta_file:
+            meta = json.load(meta_file)
+        with open(fixture_path, "rb") as body_file:
+            body = body_file.read()
+        if "json" in meta["content_type"]:
+            for recorded_host in os.listdir(self.fixture_dir):
+                body = body.replace(f"https://{recorded_host}/".encode(), f"{self.base_url}/{recorded_host}/".encode())
+        return meta["status_code"], meta["content_type"], body
+
+    def _get_handler_class(self) -> type[BaseHTTPRequestHandler]:
+        replay_server = self
+
+        class ReplayRequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if replay_server.latency_seconds:
+                    time.sleep(replay_server.latency_seconds)
+                status_code, content_type, body = replay_server._get_response(self.path)
+                self.send_response(status_code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any):
+                pass
+
+        return ReplayRequestHandler
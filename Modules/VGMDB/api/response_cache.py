@@ -0,0 +1,105 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any
+
+from Modules.Utils.general_utils import get_data_dir, get_default_logger, parse_json
+from Modules.VGMDB import constants
+
+"""
+on-disk cache of the json responses received from the vgmdb.info api, so that repeated runs do not fetch the same data again
+    * payloads are stored zlib compressed in sqlite
+    * every endpoint (album, search) has its own time to live, after which the entry is fetched again
+    * the total size of the payloads is capped, least recently used entries are evicted first
+"""
+
+logger = get_default_logger(__name__, "info")
+
+
+class ResponseCache:
+    def __init__(self, database_path: str | None = None, ttl_seconds: dict[str, float] | None = None, max_size_bytes: int = constants.RESPONSE_CACHE_MAX_SIZE_BYTES):
+        self.database_path = database_path if database_path else os.path.join(get_data_dir(), constants.RESPONSE_CACHE_FILE_NAME)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else constants.RESPONSE_CACHE_TTL_SECONDS
+        self.max_size_bytes = max_size_bytes
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    endpoint TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (endpoint, key)
+                )
+                """
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+
+    def get(self, endpoint: str, key: str) -> Any | None:
+        """returns the cached json response if it exists and has not expired"""
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT payload, created_at FROM responses WHERE endpoint = ? AND key = ?", (endpoint, key)).fetchone()
+            if row is not None and not self._is_expired(endpoint, row[1]):
+                self.connection.execute("UPDATE responses SET accessed_at = ? WHERE endpoint = ? AND key = ?", (time.time(), endpoint, key))
+        if row is None or self._is_expired(endpoint, row[1]):
+            self._count(self.misses, endpoint)
+            return None
+        try:
+            response = parse_json(zlib.decompress(row[0]))
+        except (zlib.error, ValueError) as e:
+            logger.debug(f"discarding invalid cache entry for {endpoint}/{key}, error: {e}")
+            self._count(self.misses, endpoint)
+            return None
+        self._count(self.hits, endpoint)
+        return response
+
+    def set(self, endpoint: str, key: str, response: Any):
+        payload = zlib.compress(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (endpoint, key, payload, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (endpoint, key, payload, len(payload), now, now),
+            )
+            self._evict()
+
+    def pprint_statistics(self) -> str:
+        endpoints = sorted(self.hits.keys() | self.misses.keys())
+        return ", ".join(f"{endpoint}: {self.hits.get(endpoint, 0)} hits, {self.misses.get(endpoint, 0)} misses" for endpoint in endpoints) if endpoints else "not used"
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    # private functions
+    def _is_expired(self, endpoint: str, created_at: float) -> bool:
+        ttl_seconds = self.ttl_seconds.get(endpoint)
+        return ttl_seconds is not None and time.time() - created_at > ttl_seconds
+
+    def _evict(self):
+        """deletes the least recently used entries till the total size is within the limit, must be called with the lock held"""
+        (total_size,) = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total_size <= self.max_size_bytes:
+            return
+        entries_to_delete: list[tuple[str, str]] = []
+        for endpoint, key, size in self.connection.execute("SELECT endpoint, key, size FROM responses ORDER BY accessed_at"):
+            if total_size <= self.max_size_bytes:
+                break
+            entries_to_delete.append((endpoint, key))
+            total_size -= size
+        self.connection.executemany("DELETE FROM responses WHERE endpoint = ? AND key = ?", entries_to_delete)
+        logger.debug(f"evicted {len(entries_to_delete)} entries from the response cache")
+
+    def _count(self, counter: dict[str, int], endpoint: str):
+        with self.lock:
+            counter[endpoint] = counter.get(endpoint, 0) + 1
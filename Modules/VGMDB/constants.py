@@ -1,7 +1,12 @@
 from typing import Literal
 
 
-APICALLRETRIES = 5
+APICALLRETRIES = 5  # attempts per request
+RETRY_BASE_DELAY_SECONDS = 1.0  # backoff before the nth retry is random in [0, base * 2^(n-1)]
+RETRY_MAX_DELAY_SECONDS = 30.0
+RETRY_AFTER_MAX_SECONDS = 120.0  # longest Retry-After (429/503) that is waited for
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5  # consecutive failed attempts after which requests fail fast
+CIRCUIT_BREAKER_RESET_SECONDS = 60.0  # time after which a trial request is sent to check if the api is back
 USE_LOCAL_SERVER = True  # Local server is started using docker. If set to false, it will use VGMDB_INFO_BASE_URL for fetching data
 
 VGMDB_INFO_BASE_URL = "https://vgmdb.info"  # The website has been giving some issue lately
@@ -13,3 +18,22 @@ VGMDB_INFO_LOCAL_RUN_TYPE: LOCAL_DOCKER_RUN_TYPES = "docker-compose"  # recommen
 VGMDB_INFO_DOCKER_COMPOSER_BASE_URL = "http://localhost:5020/"  # The docker compose version is fixed to run on 5020 port
 
 VGMDB_OFFICIAL_BASE_URL = "https://vgmdb.net"
+
+RESPONSE_CACHE_FILE_NAME = "vgmdb_response_cache.sqlite3"
+RESPONSE_CACHE_TTL_SECONDS: dict[str, float] = {"album": 30 * 24 * 60 * 60, "search": 24 * 60 * 60}  # album data rarely changes, search results get new albums
+RESPONSE_CACHE_MAX_SIZE_BYTES = 256 * 1024 * 1024
+
+OFFLINE_MIRROR_FILE_NAME = "vgmdb_offline_mirror.sqlite3"
+OFFLINE_MIRROR_SEARCH_LIMIT = 50
+
+ALBUM_ID_INDEX_FILE_NAME = "vgmdb_album_id_index.sqlite3"
+ALBUM_CACHE_MAX_ENTRIES = 64  # parsed albums kept in memory, must be more than the albums prefetched ahead of the current one
+SEARCH_CACHE_MAX_ENTRIES = 256
+COVER_CACHE_MAX_ENTRIES = 64
+COVER_CACHE_MAX_SIZE_BYTES = 64 * 1024 * 1024
+
+ALBUM_ID_INDEX_MIN_BARCODE_DIGITS = 8  # shorter numbers are more likely to be something else typed in the barcode tag
+
+VGMDB_MAX_CONCURRENT_REQUESTS = 4
+VGMDB_REQUESTS_PER_SECOND = 5.0  # per host, vgmdb.info is a community run service
+PREFETCH_NUM_THREADS = 2  # threads fetching the data of upcoming albums while the current album is being reviewed
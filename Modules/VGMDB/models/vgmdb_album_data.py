@@ -1,3 +1,5 @@
+import functools
+import logging
 import os
 import threading
 from typing import Any, get_args
@@ -6,9 +8,11 @@ from pydantic import BaseModel, field_validator
 from Imports.constants import LANGUAGES
 from Modules.Print.constants import LINE_SEPARATOR, SUB_LINE_SEPARATOR
 from Modules.Scan.models.local_album_data import LocalAlbumData, LocalTrackData
-from Modules.Utils.general_utils import get_default_logger
+from Modules.Utils.general_utils import background_task, get_default_logger, is_background_task
 from Modules.Utils.image_utils import compress_image_limit_max_width
+from Modules.Utils.lru_cache import LruCache
 from Modules.Utils.network_utils import download_file, get_raw_data_from_url
+from Modules.VGMDB.constants import COVER_CACHE_MAX_ENTRIES, COVER_CACHE_MAX_SIZE_BYTES
 from Modules.VGMDB.vgmdbrip.vgmdbrip import downloadScans
 
 language_aliases: dict[LANGUAGES, list[str]] = {
@@ -21,6 +25,8 @@ language_aliases: dict[LANGUAGES, list[str]] = {
 
 logger = get_default_logger(__name__, "info")
 
+album_cover_cache: LruCache[str, bytes] = LruCache(COVER_CACHE_MAX_ENTRIES, COVER_CACHE_MAX_SIZE_BYTES, get_size=len)  # compressed cover of picture_full url, shared by all albums
+
 
 class Names(BaseModel):
     english: list[str] = []
@@ -36,13 +42,14 @@ class Names(BaseModel):
         if "language_map" in language_dict:
             super().__init__(**language_dict)
             return
-        super().__init__()
-        self.language_map = {"english": self.english, "translated": self.translated, "japanese": self.japanese, "romaji": self.romaji, "other": self.others}
+        names: dict[LANGUAGES, list[str]] = {"english": [], "translated": [], "japanese": [], "romaji": [], "other": []}
         for language_key, value in language_dict.items():
             if value == "None":
                 continue
-            identified_language = self._identify_language(language_key)
-            self.language_map[identified_language].append(value)
+            names[_identify_language(language_key)].append(value)
+        # passing every field avoids pydantic deep copying the mutable defaults, which was most of the time spent parsing big albums
+        super().__init__(english=names["english"], translated=names["translated"], japanese=names["japanese"], romaji=names["romaji"], others=names["other"], language_map={})
+        self.language_map = {"english": self.english, "translated": self.translated, "japanese": self.japanese, "romaji": self.romaji, "other": self.others}
 
     def add_names(self, names: list[str], language: LANGUAGES):
         self.language_map[language].clear()
@@ -61,14 +68,20 @@ class Names(BaseModel):
         return reordered_names[0] if reordered_names else "(Not Available)"
 
     def _identify_language(self, s: str) -> LANGUAGES:
-        lang = s.lower().strip()
-        for language_key in get_args(LANGUAGES):
-            if language_key in lang:
+        return _identify_language(s)
+
+
+@functools.lru_cache(maxsize=1024)
+def _identify_language(s: str) -> LANGUAGES:
+    """memoized, there are only a handful of distinct language keys but every name of every track goes through this"""
+    lang = s.lower().strip()
+    for language_key in get_args(LANGUAGES):
+        if language_key in lang:
+            return language_key
+        for language_alias in language_aliases[language_key]:
+            if language_alias.lower() == lang:
                 return language_key
-            for language_alias in language_aliases[language_key]:
-                if language_alias.lower() == lang:
-                    return language_key
-        return "other"
+    return "other"
 
 
 class Cover(BaseModel):
@@ -156,7 +169,6 @@ class VgmdbAlbumData(BaseModel):
     album_id: str
     local_album_data: LocalAlbumData | None = None
     unmatched_local_tracks: list[LocalTrackData] = []
-    album_cover_cache: bytes | None = None
 
     @property
     def total_discs(self):
@@ -171,9 +183,12 @@ class VgmdbAlbumData(BaseModel):
         Fetching the album cover data post init using a side thread to reduce runtime later
         We don't have to use mutex for locking the function because the fetched value is always the same
         """
-        thread = threading.Thread(target=self.get_album_cover_data)
+        if not self.picture_full:
+            return
+        in_background = is_background_task()
+        thread = threading.Thread(target=self._fetch_album_cover_in_background if in_background else self.get_album_cover_data)
         thread.start()
-        logger.info("Fetching for album cover in background")
+        logger.log(logging.DEBUG if in_background else logging.INFO, "Fetching for album cover in background")
 
     @field_validator("catalog", mode="before")
     @classmethod
@@ -219,13 +234,27 @@ class VgmdbAlbumData(BaseModel):
         # add more matching algorithms...
         self.unmatched_local_tracks = list(temp_unmatched_local_tracks_set)  # update the unmatched list
 
+    def unlink_local_album_data(self):
+        """drops the references to local tracks (and their audio managers) once the album is processed, the album data itself may stay cached"""
+        self.local_album_data = None
+        self.unmatched_local_tracks = []
+        for disc in self.discs.values():
+            for track in disc.tracks.values():
+                track.local_track = None
+
     def get_album_cover_data(self) -> bytes | None:
         if not self.picture_full:
             return None
-        if self.album_cover_cache:
-            return self.album_cover_cache
-        self.album_cover_cache = compress_image_limit_max_width(get_raw_data_from_url(self.picture_full))
-        return self.album_cover_cache
+        album_cover_data = album_cover_cache.get(self.picture_full)
+        if album_cover_data:
+            return album_cover_data
+        try:
+            album_cover_data = compress_image_limit_max_width(get_raw_data_from_url(self.picture_full))
+        except Exception as e:
+            logger.log(logging.DEBUG if is_background_task() else logging.ERROR, f"could not fetch the album cover from {self.picture_full}, error: {e}")
+            return None
+        album_cover_cache.set(self.picture_full, album_cover_data)
+        return album_cover_data
 
     def download_scans(self, output_dir: str, no_auth: bool = False):
         if no_auth:
@@ -254,6 +283,10 @@ class VgmdbAlbumData(BaseModel):
                 track.names.clear_names(names_language)
 
     # private functions
+    def _fetch_album_cover_in_background(self):
+        with background_task():
+            self.get_album_cover_data()
+
     def _does_track_exist(self, disc_number: int, track_number: int) -> bool:
         if disc_number not in self.discs or track_number not in self.discs[disc_number].tracks:
             return False
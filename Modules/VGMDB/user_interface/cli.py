@@ -2,31 +2,44 @@ import os
 import shutil
 import traceback
 import questionary
+import collections
 import concurrent.futures
-from typing import Any, Callable
+from urllib.parse import urlsplit
+from typing import Any, Callable, Iterator
 
 from Imports.config import Config
 from Imports.constants import THREAD_EXECUTOR_NUM_THREADS
-from unigen import IAudioManager
 from Modules.Organize.organizer import Organizer
 from Modules.Organize.models.organize_result import FolderOrganizeResult
 from Modules.Print import table
 from Modules.Print.utils import get_panel, get_rich_console, print_separator
 from Modules.Scan.scanner import Scanner
+from Modules.Scan.scan_cache import ScanCache
 from Modules.Scan.models.local_album_data import LocalAlbumData
-from Modules.Tag import custom_tags
+from Modules.Scan.models.track_tags import TrackTags
 from Modules.Tag.tagger import Tagger
 from Modules.Translate.translator import Translator
+from Modules.Utils.network_utils import configure_http_transport, get_http_transport
 from Modules.Utils.general_utils import (
     get_default_logger,
+    get_peak_memory_usage_mb,
     ifNot,
     to_sentence_case,
     extractYearFromDate,
 )
+from Modules.VGMDB.api.album_id_index import AlbumIdIndex
 from Modules.VGMDB.api.client import VgmdbClient
+from Modules.VGMDB.api.offline_mirror import OfflineMirror
+from Modules.VGMDB.api.prefetcher import AlbumPrefetcher
+from Modules.VGMDB.api.rate_limiter import HostRateLimiter
+from Modules.VGMDB.api.record_replay import ReplayServer, ResponseRecorder
+from Modules.VGMDB.api.response_cache import ResponseCache
+from Modules.Watch.debouncer import FolderDebouncer
+from Modules.Watch.folder_watcher import get_folder_watcher
+from Modules.Watch.processed_folders import ProcessedFolders
 from Modules.VGMDB.models.vgmdb_album_data import Names, VgmdbAlbumData
 from Modules.VGMDB.user_interface import constants
-from Modules.VGMDB.constants import VGMDB_OFFICIAL_BASE_URL
+from Modules.VGMDB.constants import PREFETCH_NUM_THREADS, VGMDB_INFO_BASE_URL, VGMDB_OFFICIAL_BASE_URL
 
 logger = get_default_logger(__name__, "info")
 
@@ -35,38 +48,108 @@ class CLI:
     def __init__(self, config: Config):
         self.root_config = config
         ensure_album_match = False if config.singles else True
-        self.scanner = Scanner(ensure_album_match)
+        self.scanner = Scanner(
+            ensure_album_match,
+            num_threads=config.scan_threads,
+            scan_cache=ScanCache() if config.scan_cache else None,
+            verify_file_signatures=config.verify_file_signatures,
+            light_scan=config.light_scan,
+            split_mixed_folders=config.split_mixed_folders,
+            ignore_patterns=config.scan_ignore_patterns,
+            listing_threads=config.scan_listing_threads,
+        )
         self.translator = Translator()
-        if config.tag:
-            self.vgmdb_client = VgmdbClient()
+        configure_http_transport(config.http_connect_timeout, config.http_read_timeout, config.http_pool_size)
+        self.replay_server: ReplayServer | None = None
+        if config.tag and not config.import_mirror and config.replay_dir:
+            self.replay_server = ReplayServer(config.replay_dir, config.replay_latency, config.replay_error_rate)
+            self.replay_server.start()
+        if config.tag and not config.import_mirror:
+            self.vgmdb_client = VgmdbClient(
+                response_cache=ResponseCache() if config.response_cache else None,
+                refresh=config.refresh,
+                rate_limiter=HostRateLimiter(config.vgmdb_requests_per_second),
+                offline_mirror=OfflineMirror() if config.offline else None,
+                album_id_index=AlbumIdIndex() if config.album_id_index else None,
+                base_url=self.replay_server.get_url(f"{VGMDB_INFO_BASE_URL}/") if self.replay_server else None,
+            )
+            if config.record_dir:
+                vgmdb_info_host = urlsplit(VGMDB_INFO_BASE_URL).netloc
+                ResponseRecorder(config.record_dir, host_aliases={urlsplit(self.vgmdb_client.vgmdb_info_base_url).netloc: vgmdb_info_host}).attach(get_http_transport().session)
         self.console = get_rich_console()
         self.colors = {"red": "#f3aba8", "green": "#d3f5b3"}
         self.no_change = ""
         self.not_available = "(Not Available)"
 
     def run(self):
-        albums = self._scan_directories(self.root_config.root_dir)
-        self.console.log(f"Found {len(albums)} Albums") if not self.root_config.singles else self.console.log(f"Found {len(albums)} folders containing individual tracks")
-        print_separator()
-        for album in albums:
-            self.console.print(f"[bright_magenta bold]Operating on {album.album_folder_name}")
-            if self.root_config.backup:
-                self.console.print(get_panel(f"[bold green]Backing Up"))
-                self._backup_local_album(album)
-            print_separator()
-            try:
-                local_album_config = self.root_config.model_copy()
-                local_album_config.root_dir = album.album_folder_path
-                self.operate(album, local_album_config)
-                print_separator()
-                self.console.log(f"[green]Successfully Finished All Oprations on {album.album_folder_name}")
-                print_separator()
-            except Exception as e:
-                print_separator()
-                self.console.log(f"[bright_red bold]Error Occurred: {type(e).__name__} -> {e}, skipping {album.album_folder_path}")
-                traceback_info = traceback.format_exc()
-                logger.debug(traceback_info)
-                print_separator()
+        if self.root_config.import_mirror:
+            offline_mirror = OfflineMirror()
+            imported_albums = offline_mirror.import_folder(self.root_config.import_mirror)
+            self.console.log(f"Imported {imported_albums} Albums into the Offline Mirror, it now contains {offline_mirror.get_album_count()} Albums")
+            offline_mirror.close()
+            return
+        if self.root_config.find_duplicates:
+            self.console.print(get_panel("[bold green]Finding Duplicates"))
+            self.console.print(self.scanner.find_duplicates(self.root_config.root_dir).pprint(), markup=False)  # folder names often contain [...]
+            return
+        if self.root_config.watch:
+            self.watch()
+            return
+        albums_found = 0
+        prefetcher = self._get_prefetcher()
+        try:
+            # albums are scanned lazily, so processing starts as soon as the first albums are found
+            for album in self._look_ahead(self._scan_directories(self.root_config.root_dir), prefetcher):
+                albums_found += 1
+                self._log_albums_found(albums_found)
+                self._operate_on_album(album)
+        finally:
+            if prefetcher:
+                prefetcher.close()
+        self._log_albums_found(albums_found)
+        self.console.log(f"Scan Summary: {self.scanner.statistics.pprint()}")
+        if self.root_config.tag:
+            self.console.log(f"VGMDB Memory Caches: {self.vgmdb_client.pprint_cache_statistics()}")
+        if self.root_config.tag and self.vgmdb_client.response_cache:
+            self.console.log(f"VGMDB Response Cache: {self.vgmdb_client.response_cache.pprint_statistics()}")
+        if self.replay_server:
+            self.console.log(f"Replay Server: {self.replay_server.pprint_statistics()}")
+            self.replay_server.stop()
+        peak_memory_usage_mb = get_peak_memory_usage_mb()
+        if peak_memory_usage_mb is not None:
+            self.console.log(f"Peak Memory Usage: {peak_memory_usage_mb:.1f} MB")
+
+    def watch(self):
+        """keep watching root_dir, operating only on the albums in which something changed, once the changes settle down"""
+        root_dir = os.path.abspath(self.root_config.root_dir)
+        watcher = get_folder_watcher(root_dir, self.root_config.scan_ignore_patterns, use_polling=self.root_config.watch_polling)
+        debouncer = FolderDebouncer(self.root_config.watch_debounce)
+        processed_folders = ProcessedFolders()
+        self.console.log(f"Watching {root_dir} for changes, press Ctrl+C to stop")
+        try:
+            while True:
+                for changed_folder in watcher.read_changed_folders(debouncer.get_timeout()):
+                    debouncer.add(changed_folder)
+                albums_of_folder: dict[str, list[LocalAlbumData]] = {}
+                for ready_folder in debouncer.pop_ready():
+                    if not os.path.isdir(ready_folder):  # deleted or moved away
+                        continue
+                    for album in self.scanner.scan_albums_containing_folder(ready_folder, root_dir):
+                        albums = albums_of_folder.setdefault(album.album_folder_path, [])
+                        if album.split_group not in [existing_album.split_group for existing_album in albums]:
+                            albums.append(album)
+                for album_folder_path, albums in albums_of_folder.items():
+                    if processed_folders.is_unchanged(album_folder_path):
+                        logger.debug(f"no changes in audio files of {album_folder_path} since it was processed, skipping")
+                        continue
+                    folder_inode = os.stat(album_folder_path).st_ino
+                    for album in albums:
+                        self._operate_on_album(album)
+                    processed_folders.record(album_folder_path, folder_inode)
+        except KeyboardInterrupt:
+            self.console.log("Stopped Watching")
+        finally:
+            watcher.close()
 
     def operate(self, local_album_data: LocalAlbumData, config: Config) -> None:
         """Operate on the album (tag, download scans, organize,...)"""
@@ -93,10 +176,10 @@ class CLI:
                 self.console.log(f"[bright_red bold]Error While Organizing: {type(e).__name__} -> {e}, not Organizing {local_album_data.album_folder_name}")
                 print_separator()
 
-    def tag(self, local_album_data: LocalAlbumData, config: Config) -> bool:
+    def tag(self, local_album_data: LocalAlbumData, config: Config, use_album_id_index: bool = True) -> bool:
         self.console.print(get_panel("[bold green]Tagging Metadata"))
         self.console.log(f"Fetching Album ID")
-        album_id = self._get_album_id(local_album_data, config)
+        album_id = self._get_album_id(local_album_data, config, use_album_id_index)
         if not album_id:
             raise Exception(f"Could Not Find Album ID For Folder: {local_album_data.album_folder_path}")
 
@@ -105,26 +188,30 @@ class CLI:
 
         logger.debug("linking local album data with vgmdb album data")
         vgmdb_album_data.link_local_album_data(local_album_data)
+        try:
+            logger.debug("showing match and getting confirmation")
+            instruction = self._confirm_before_proceeding_to_tag(vgmdb_album_data, config)
+            if instruction == constants.choices.no:
+                logger.debug("tagging cancelled by user")
+                return False
+            if instruction == constants.choices.go_back:
+                config.year_search = ""
+                return self.tag(local_album_data, config, use_album_id_index=False)  # the user wants to see the search results
 
-        logger.debug("showing match and getting confirmation")
-        instruction = self._confirm_before_proceeding_to_tag(vgmdb_album_data, config)
-        if instruction == constants.choices.no:
-            logger.debug("tagging cancelled by user")
-            return False
-        if instruction == constants.choices.go_back:
-            config.year_search = ""
-            return self.tag(local_album_data, config)
+            if config.scans_download and self.root_config.offline:
+                self.console.print("[bold yellow]Scans are not downloaded in offline mode")
+            elif config.scans_download:
+                print_separator()
+                self.console.print("[bold green]Downloading Scans")
+                vgmdb_album_data.download_scans(local_album_data.album_folder_path, no_auth=self.root_config.no_auth)
+                print_separator()
 
-        if config.scans_download:
-            print_separator()
-            self.console.print("[bold green]Downloading Scans")
-            vgmdb_album_data.download_scans(local_album_data.album_folder_path, no_auth=self.root_config.no_auth)
+            self.console.print("[bold green]Tagging Album")
+            Tagger(local_album_data, vgmdb_album_data, config).tag_files()
             print_separator()
-
-        self.console.print("[bold green]Tagging Album")
-        Tagger(local_album_data, vgmdb_album_data, config).tag_files()
-        print_separator()
-        return True
+            return True
+        finally:
+            vgmdb_album_data.unlink_local_album_data()  # vgmdb_album_data stays cached in vgmdb_client, the local album must not stay alive with it
 
     def organize(self, local_album_data: LocalAlbumData, config: Config) -> bool:
         print_separator()
@@ -141,6 +228,65 @@ class CLI:
         return True
 
     # Private Functions
+    def _operate_on_album(self, album: LocalAlbumData):
+        print_separator()
+        self.console.print(f"[bright_magenta bold]Operating on {album.album_folder_name}{f' ({album.split_group})' if album.split_group else ''}")
+        if self.root_config.backup:
+            self.console.print(get_panel(f"[bold green]Backing Up"))
+            self._backup_local_album(album)
+        print_separator()
+        try:
+            local_album_config = self.root_config.model_copy()
+            local_album_config.root_dir = album.album_folder_path
+            if album.split_group:  # the folder is shared with other albums, so it must not be renamed
+                local_album_config.rename_folder = False
+            self.operate(album, local_album_config)
+            print_separator()
+            self.console.log(f"[green]Successfully Finished All Oprations on {album.album_folder_name}")
+            print_separator()
+        except Exception as e:
+            print_separator()
+            self.console.log(f"[bright_red bold]Error Occurred: {type(e).__name__} -> {e}, skipping {album.album_folder_path}")
+            traceback_info = traceback.format_exc()
+            logger.debug(traceback_info)
+            print_separator()
+        finally:
+            album.release_audio_managers()
+            logger.debug(f"peak memory usage after {album.album_folder_name}: {get_peak_memory_usage_mb()} MB")
+
+    def _is_unattended_run(self) -> bool:
+        return self.root_config.tag and self.root_config.recur and self.root_config.no_input
+
+    def _get_look_ahead_size(self) -> int:
+        """unattended runs keep enough albums ahead for vgmdb_max_concurrency fetches to be in flight while the current album is tagged"""
+        if not self.root_config.tag or self.root_config.prefetch_albums <= 0:
+            return 0
+        if self._is_unattended_run():
+            return max(self.root_config.prefetch_albums, self.root_config.vgmdb_max_concurrency)
+        return self.root_config.prefetch_albums
+
+    def _get_prefetcher(self) -> AlbumPrefetcher | None:
+        if self._get_look_ahead_size() <= 0:
+            return None
+        num_threads = self.root_config.vgmdb_max_concurrency if self._is_unattended_run() else PREFETCH_NUM_THREADS
+        return AlbumPrefetcher(self.vgmdb_client, num_threads)
+
+    def _look_ahead(self, albums: Iterator[LocalAlbumData], prefetcher: AlbumPrefetcher | None) -> Iterator[LocalAlbumData]:
+        """keeps a few albums ready after the current one (see _get_look_ahead_size), their vgmdb data is fetched in background as soon as they are scanned"""
+        if not prefetcher:
+            yield from albums
+            return
+        look_ahead_size = self._get_look_ahead_size()
+        upcoming_albums: collections.deque[LocalAlbumData] = collections.deque()
+        for album in albums:
+            track_tags = album.get_one_sample_track().scanned_tags
+            search_term, _ = self._get_search_term(album, track_tags, self.root_config)
+            prefetcher.prefetch(self._get_embedded_album_id(track_tags) or self._get_indexed_album_id(track_tags), search_term)
+            upcoming_albums.append(album)
+            if len(upcoming_albums) > look_ahead_size:
+                yield upcoming_albums.popleft()
+        yield from upcoming_albums
+
     def _confirm_before_proceeding_to_organize(self, folder_organize_result: FolderOrganizeResult, config: Config) -> constants.choices:
         all_good = self._find_and_show_match_for_organization(folder_organize_result, config) and folder_organize_result.no_unclean_files
         message = "Please review changes, there might be issues" if not all_good else "Everything seems fine, proceed?"
@@ -312,8 +458,8 @@ class CLI:
         for local_track in vgmdb_album_data.unmatched_local_tracks:
             table_data.append(
                 (
-                    ifNot(local_track.audio_manager.getDiscNumber(), constants.NULL_INT),
-                    ifNot(local_track.audio_manager.getTrackNumber(), constants.NULL_INT),
+                    ifNot(local_track.scanned_tags.disc_number, constants.NULL_INT),
+                    ifNot(local_track.scanned_tags.track_number, constants.NULL_INT),
                     "",
                     local_track.file_name,
                 )
@@ -343,31 +489,30 @@ class CLI:
         is_perfect_match = all(col for row in table_data for col in row)  # perfect match only if nothing is "" or None
         return is_perfect_match
 
-    def _get_album_id(self, local_album_data: LocalAlbumData, config: Config) -> str | None:
-        audio_manager = local_album_data.get_one_sample_track().audio_manager
-        vgmdb_id = audio_manager.getCustomTag(custom_tags.VGMDB_ID)
-        if vgmdb_id and vgmdb_id[0].isdigit():
+    def _get_album_id(self, local_album_data: LocalAlbumData, config: Config, use_album_id_index: bool = True) -> str | None:
+        track_tags = local_album_data.get_one_sample_track().scanned_tags
+        embedded_album_id = self._get_embedded_album_id(track_tags)
+        if embedded_album_id:
             self.console.log("Found Album ID in Embedded Tag")
-            use_embedded_id = questionary.confirm(f"Use Embedded Album ID ({VGMDB_OFFICIAL_BASE_URL}/album/{vgmdb_id[0]})?").skip_if(config.yes, default=constants.choices.yes.value).ask()
+            use_embedded_id = questionary.confirm(f"Use Embedded Album ID ({VGMDB_OFFICIAL_BASE_URL}/album/{embedded_album_id})?").skip_if(config.yes, default=constants.choices.yes.value).ask()
             if use_embedded_id:
-                return vgmdb_id[0]
+                return embedded_album_id
+
+        if use_album_id_index and not config.search:
+            indexed_album_id = self._get_indexed_album_id(track_tags)
+            if indexed_album_id:
+                self.console.log(f"Found Album ID Using Catalog Number/Barcode: {VGMDB_OFFICIAL_BASE_URL}/album/{indexed_album_id}")
+                return indexed_album_id
 
         # get search term
-        search_reason = "provided search term"
-        if not config.search:
-            config.search, search_reason = self._extract_search_term_from_audio_file(audio_manager)
-        if not config.search:
-            config.search, search_reason = (
-                local_album_data.album_folder_name,
-                "folder name",
-            )
+        config.search, search_reason = self._get_search_term(local_album_data, track_tags, config)
         if not config.search:
             return None
         logger.debug(f"using {search_reason} as search term")
 
         # get year for filtering search results
         if config.year_search is None:
-            config.year_search = extractYearFromDate(audio_manager.getDate())
+            config.year_search = extractYearFromDate(track_tags.date)
 
         # keep searching for album using interaction with the user
         album_id: str | None = None
@@ -454,22 +599,39 @@ class CLI:
                 config.year_search = ""
         return album_id
 
-    def _scan_directories(self, root_dir: str) -> list[LocalAlbumData]:
+    def _scan_directories(self, root_dir: str) -> Iterator[LocalAlbumData]:
         if self.root_config.recur:
-            local_albums = self.scanner.scan_albums_recursively(root_dir)
+            yield from self.scanner.iter_albums(root_dir)
         else:
-            local_album = self.scanner.scan_album_in_folder_if_exists(root_dir)
-            local_albums = [local_album] if local_album else []
-        return local_albums
-
-    def _extract_search_term_from_audio_file(self, audio_manager: IAudioManager) -> tuple[str | None, str | None]:
-        tag_functions: list[tuple[Callable[[], list[str]], str]] = [
-            (audio_manager.getCatalog, "catalog number"),
-            (audio_manager.getBarcode, "barcode"),
-            (audio_manager.getAlbum, "album name"),
+            yield from self.scanner.scan_albums_in_folder(root_dir)
+
+    def _log_albums_found(self, albums_found: int):
+        self.console.log(f"Found {albums_found} Albums") if not self.root_config.singles else self.console.log(f"Found {albums_found} folders containing individual tracks")
+
+    def _get_embedded_album_id(self, track_tags: TrackTags) -> str | None:
+        vgmdb_id = track_tags.vgmdb_id
+        return vgmdb_id[0] if vgmdb_id and vgmdb_id[0].isdigit() else None
+
+    def _get_indexed_album_id(self, track_tags: TrackTags) -> str | None:
+        """album id of the only album known to have the catalog number or barcode present in the tags"""
+        return self.vgmdb_client.find_album_id(track_tags.catalog[0] if track_tags.catalog else None, track_tags.barcode[0] if track_tags.barcode else None)
+
+    def _get_search_term(self, local_album_data: LocalAlbumData, track_tags: TrackTags, config: Config) -> tuple[str | None, str]:
+        """provided search term, else catalog number, barcode or album name from tags, else the folder name"""
+        if config.search:
+            return config.search, "provided search term"
+        search_term, search_reason = self._extract_search_term_from_track_tags(track_tags)
+        if search_term and search_reason:
+            return search_term, search_reason
+        return local_album_data.album_folder_name, "folder name"
+
+    def _extract_search_term_from_track_tags(self, track_tags: TrackTags) -> tuple[str | None, str | None]:
+        tag_values: list[tuple[list[str], str]] = [
+            (track_tags.catalog, "catalog number"),
+            (track_tags.barcode, "barcode"),
+            (track_tags.album, "album name"),
         ]
-        for func, tag in tag_functions:
-            value = func()
+        for value, tag in tag_values:
             if value:
                 return value[0], tag
         return None, None
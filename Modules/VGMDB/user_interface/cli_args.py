@@ -20,6 +20,32 @@ class CLIArgs(Tap):
     backup: bool = False  # Backup the albums before modifying
     backup_folder: str = "~/Music/Backups"  # folder to backup the albums to before modification
     no_auth: bool = False  # Do not authenticate for downloading Scans
+    no_response_cache: bool = False  # Do not use the on-disk cache of VGMDB responses, everything is fetched again and nothing is stored
+    refresh: bool = False  # Fetch VGMDB responses again even if they are cached, the cache is updated with the fresh responses
+    no_album_id_index: bool = False  # Always search VGMDB, even if the catalog number or barcode of the album is known to belong to exactly one album
+    http_connect_timeout: float = 10.0  # Seconds to wait for a connection to VGMDB (or a scan host) before giving up
+    http_read_timeout: float = 60.0  # Seconds to wait for data from an open connection before giving up
+    http_pool_size: int = 8  # Number of connections kept alive per host, should be at least the number of parallel downloads
+    vgmdb_max_concurrency: int = 4  # Maximum VGMDB requests in flight at once while upcoming albums are prefetched in unattended runs (--recur --no_input)
+    vgmdb_requests_per_second: float = 5.0  # Maximum requests per second sent to the VGMDB API host, 0 disables the limit
+    prefetch_albums: int = 2  # Number of upcoming albums whose VGMDB data is fetched in background while the current album is reviewed, 0 disables prefetching
+    offline: bool = False  # Serve VGMDB data only from the offline mirror (see --import_mirror), no docker server and no network needed
+    import_mirror: str | None = None  # Import the VGMDB album json documents present in this folder into the offline mirror and exit
+    record_dir: str | None = None  # Save every VGMDB (and cover/scan) response received into this folder, to be replayed later with --replay_dir
+    replay_dir: str | None = None  # Serve VGMDB responses recorded with --record_dir from a local stand-in server instead of vgmdb.info, no docker server and no network needed
+    replay_latency: float = 0.0  # Seconds the replay server waits before answering every request, simulates a slow VGMDB
+    replay_error_rate: float = 0.0  # Fraction of requests the replay server answers with a 503 error, exercises the retries
+    scan_threads: int = 1  # Number of threads used for reading audio files while scanning, speeds up scanning on network storage
+    scan_listing_threads: int = 1  # Number of folders listed in parallel while walking the library, hides the latency of network mounts (NFS, SMB)
+    no_scan_cache: bool = False  # Do not use the on-disk cache of tags read while scanning, every file will be read again
+    verify_file_signatures: bool = False  # Check the first bytes of audio files while scanning, skipping files with a wrong extension without reading them
+    light_scan: bool = False  # Only read text tags while scanning (no embedded pictures), files are opened fully only when they are tagged. Keeps memory low for huge libraries
+    split_mixed_folders: bool = False  # Split a folder containing tracks of multiple albums into separate albums (by vgmdb link, catalog, barcode or album name) instead of skipping it. Such folders are never renamed
+    scan_ignore_patterns: list[str] | None = None  # Glob patterns of folders that are never scanned, matched against folder names (or relative paths if they contain "/"). Defaults to Scans and Logs, give the option without patterns to scan every folder. A .taggerignore file inside a folder adds patterns for that folder
+    find_duplicates: bool = False  # Only report tracks and albums with identical audio (ignoring tags) in the folder recursively, nothing is tagged or renamed
+    watch: bool = False  # Keep running and operate on albums as soon as they are added or changed inside the folder (inotify on linux, polling elsewhere)
+    watch_debounce: float | None = None  # Seconds without any change in a folder before it is operated on in watch mode, defaults to 5
+    watch_polling: bool = False  # Use polling instead of inotify in watch mode, needed for network mounts where inotify does not report remote changes
 
     no_tag: bool = False  # Do not tag the files
     no_rename: bool = False  # Do not rename or move anything
@@ -69,7 +95,7 @@ class CLIArgs(Tap):
 def get_config_from_args() -> Config:
     """returns a Config instance after parsing the cli arguments and config present in config.json"""
     args = _get_args()
-    config = get_config(**{k: v for k, v in args.items() if v})  # Removing None values first
+    config = get_config(**{k: v for k, v in args.items() if v is not None and v is not False and v != ""})  # Removing unset values first, 0 and empty lists are valid values
 
     # if args["translate"]:
     #     config.keep_title = True # Choosing not to do this anymore
@@ -85,6 +111,12 @@ def get_config_from_args() -> Config:
     if args["no_input"]:
         config.no_input = True
         config.yes = True
+    if args["no_scan_cache"]:
+        config.scan_cache = False
+    if args["no_response_cache"]:
+        config.response_cache = False
+    if args["no_album_id_index"]:
+        config.album_id_index = False
 
     if args["no_rename_folder"]:
         config.rename_folder = False
@@ -2,6 +2,7 @@ import os
 import hashlib
 import getpass
 import pickle
+import weakref
 import requests
 import concurrent.futures
 from typing import Any
@@ -16,9 +17,10 @@ sys.path.append(os.getcwd())
 from Imports.constants import THREAD_EXECUTOR_NUM_THREADS
 from Modules.Print.utils import get_rich_console
 from Modules.Utils.general_utils import getSha256
-from Modules.Utils.network_utils import download_file
+from Modules.Utils.network_utils import HttpTransport, download_file, get_http_transport
 
 session = requests.Session()
+transport_of_session: "weakref.WeakKeyDictionary[requests.Session, HttpTransport]" = weakref.WeakKeyDictionary()
 
 
 def Soup(data: Any):
@@ -26,17 +28,27 @@ def Soup(data: Any):
 
 
 def is_logged_in(current_session: Any) -> bool:
-    x = current_session.get("https://vgmdb.net/forums/private.php")
+    x = get_http_transport().get("https://vgmdb.net/forums/private.php", session=current_session)
     soup = Soup(x.content)
     login_element = soup.find("a", href="#", string="Login")
     return login_element is None
 
 
+def mount_http_transport(current_session: requests.Session):
+    """done lazily instead of at import, so that the transport configured at startup (timeouts, pool size) is the one used"""
+    http_transport = get_http_transport()
+    if transport_of_session.get(current_session) is not http_transport:
+        http_transport.mount(current_session)
+        transport_of_session[current_session] = http_transport
+
+
 def login(config: str):
     global session
     logged_in = False
+    mount_http_transport(session)
     if os.path.isfile(config):
         temp_session = pickle.load(open(config, "rb"))
+        mount_http_transport(temp_session)  # pickled sessions keep the adapters they were saved with
         if is_logged_in(temp_session):
             logged_in = True
             session = temp_session
@@ -46,9 +58,11 @@ def login(config: str):
             username = input("VGMdb username:\t")
             password = getpass.getpass("VGMdb password:\t")
             base_url = "https://vgmdb.net/forums/"
-            x = session.post(
+            x = get_http_transport().request(
+                "POST",
                 base_url + "login.php?do=login",
-                {
+                session=session,
+                data={
                     "vb_login_username": username,
                     "vb_login_password": password,
                     "vb_login_md5password": hashlib.md5(password.encode()).hexdigest(),
@@ -94,7 +108,7 @@ def downloadScans(outputDir: str, albumID: str):
     config = os.path.join(scriptdir, "vgmdbrip.pkl")
     login(config)
     with console.status("[bold magenta]Authenticating and Fetching Scans") as status:
-        soup = Soup(session.get("https://vgmdb.net/album/" + albumID).content)
+        soup = Soup(get_http_transport().get("https://vgmdb.net/album/" + albumID, session=session).content)
         gallery = soup.find("div", attrs={"class": "covertab", "id": "cover_gallery"})
 
         if not isinstance(gallery, Tag):
@@ -0,0 +1,26 @@
+import time
+
+
+class FolderDebouncer:
+    """collects changed folders, a folder is ready only once no change has been seen in it for delay_seconds, so that a burst of events (copying an album) is handled once"""
+
+    def __init__(self, delay_seconds: float):
+        self.delay_seconds = delay_seconds
+        self.last_change_times: dict[str, float] = {}
+
+    def add(self, folder_path: str, now: float | None = None):
+        self.last_change_times[folder_path] = time.monotonic() if now is None else now
+
+    def pop_ready(self, now: float | None = None) -> list[str]:
+        now = time.monotonic() if now is None else now
+        ready_folders = [folder_path for folder_path, last_change_time in self.last_change_times.items() if now - last_change_time >= self.delay_seconds]
+        for folder_path in ready_folders:
+            del self.last_change_times[folder_path]
+        return ready_folders
+
+    def get_timeout(self, now: float | None = None) -> float | None:
+        """seconds until the next folder gets ready, None if there is nothing pending"""
+        if not self.last_change_times:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(self.last_change_times.values()) + self.delay_seconds - now)
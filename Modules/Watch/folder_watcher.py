@@ -0,0 +1,204 @@
+import abc
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from Modules.Scan.audio_file_filter import has_supported_extension
+from Modules.Scan.ignore_rules import IgnoreRules
+from Modules.Scan.walker import DirectoryNode, DirectoryWalker
+from Modules.Utils.general_utils import get_default_logger
+from Modules.Watch import constants
+
+"""
+watchers report the folders inside root_dir in which something changed (files added, removed, renamed or written)
+    * InotifyWatcher uses linux inotify through ctypes, every folder is watched once at the start and the kernel reports the changes, so the cost of an event does not depend on the size of the library.
+      if the kernel queue overflows, the changed folders are found by comparing the library with its state at the start (or at the last overflow), like PollingWatcher does
+    * PollingWatcher is the fallback for other platforms (or when inotify is not usable, like on some network mounts), it lists the library every few seconds and compares it with the last listing
+folders matching the ignore patterns (Scans, Logs, etc) are not watched
+"""
+
+logger = get_default_logger(__name__, "info")
+
+
+class FolderWatcher(abc.ABC):
+    def __init__(self, root_dir: str, ignore_patterns: list[str] | None = None):
+        self.root_dir = root_dir
+        self.ignore_patterns = ignore_patterns if ignore_patterns else []
+        self.walker = DirectoryWalker(self.ignore_patterns)
+        self.folder_states: dict[str, frozenset[tuple[str, int, int]]] = {}
+
+    @abc.abstractmethod
+    def read_changed_folders(self, timeout: float | None) -> list[str]:
+        """blocks until there are changes or till timeout (None = forever), returns the changed folders"""
+
+    def close(self):
+        pass
+
+    # private functions
+    def _is_ignored(self, folder_path: str) -> bool:
+        return IgnoreRules.from_patterns(self.root_dir, self.ignore_patterns).is_ignored(folder_path)
+
+    def _get_changed_folders(self) -> list[str]:
+        """folders whose state changed since the last call (or since folder_states was set), the parents of removed folders are reported as changed"""
+        folder_states = self._get_folder_states()
+        changed_folders = [folder_path for folder_path, state in folder_states.items() if self.folder_states.get(folder_path) != state]
+        for removed_folder in self.folder_states.keys() - folder_states.keys():
+            parent_folder = os.path.dirname(removed_folder)
+            if parent_folder in folder_states and parent_folder not in changed_folders:
+                changed_folders.append(parent_folder)
+        self.folder_states = folder_states
+        return changed_folders
+
+    def _get_folder_states(self) -> dict[str, frozenset[tuple[str, int, int]]]:
+        """(name, size, mtime_ns) of every audio file and the names of the subfolders, for every folder"""
+        folder_states: dict[str, frozenset[tuple[str, int, int]]] = {}
+        stack: list[DirectoryNode] = [self.walker.walk(self.root_dir)]
+        while stack:
+            node = stack.pop()
+            state: set[tuple[str, int, int]] = set()
+            for entry in node.entries:
+                if entry.path in node.subdirectories:
+                    state.add((entry.name, -1, -1))
+                elif has_supported_extension(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    state.add((entry.name, stat.st_size, stat.st_mtime_ns))
+            folder_states[node.path] = frozenset(state)
+            stack.extend(node.get_subdirectories())
+        return folder_states
+
+
+class InotifyWatcher(FolderWatcher):
+    def __init__(self, root_dir: str, ignore_patterns: list[str] | None = None):
+        super().__init__(root_dir, ignore_patterns)
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+        self.watched_folders: dict[int, str] = {}  # watch descriptor -> folder path
+        self.missed_changes = False
+        self.overflows = 0
+        self._watch_tree(root_dir)
+        self.folder_states = self._get_folder_states()  # only used for finding the changes missed when the queue overflows
+        logger.info(f"watching {len(self.watched_folders)} folders in {root_dir} using inotify")
+
+    def read_changed_folders(self, timeout: float | None) -> list[str]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        changed_folders: dict[str, None] = {}  # ordered set
+        while True:
+            try:
+                data = os.read(self.fd, constants.INOTIFY_READ_SIZE)
+            except BlockingIOError:
+                break
+            for changed_folder in self._parse_events(data):
+                changed_folders[changed_folder] = None
+        if self.missed_changes:
+            self.missed_changes = False
+            self.overflows += 1
+            self._watch_tree(self.root_dir)  # folders created while events were dropped are not watched yet
+            for changed_folder in self._get_changed_folders():
+                changed_folders[changed_folder] = None
+        return list(changed_folders)
+
+    def close(self):
+        os.close(self.fd)
+
+    # private functions
+    def _parse_events(self, data: bytes) -> list[str]:
+        changed_folders: list[str] = []
+        offset = 0
+        while offset + 16 <= len(data):
+            watch_descriptor, mask, _, name_length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16 : offset + 16 + name_length].rstrip(b"\0").decode(errors="surrogateescape")
+            offset += 16 + name_length
+
+            if mask & constants.IN_Q_OVERFLOW:
+                logger.error("inotify queue overflowed, some changes were missed, comparing the library with its last known state")
+                self.missed_changes = True
+                continue
+            if mask & constants.IN_IGNORED:
+                self.watched_folders.pop(watch_descriptor, None)
+                continue
+            folder_path = self.watched_folders.get(watch_descriptor)
+            if folder_path is None or not name:
+                continue
+            path = os.path.join(folder_path, name)
+            if mask & constants.IN_ISDIR:
+                if self._is_ignored(path):
+                    continue
+                if mask & (constants.IN_CREATE | constants.IN_MOVED_TO):
+                    self._watch_tree(path)
+                    changed_folders.append(path)
+                    continue
+                if mask & constants.IN_MOVED_FROM:
+                    self._unwatch_tree(path)
+            changed_folders.append(folder_path)
+        return changed_folders
+
+    def _watch_tree(self, folder_path: str):
+        stack = [self.walker.walk(folder_path)]
+        while stack:
+            node = stack.pop()
+            self._add_watch(node.path)
+            stack.extend(node.get_subdirectories())
+
+    def _add_watch(self, folder_path: str):
+        watch_descriptor = self.libc.inotify_add_watch(self.fd, os.fsencode(folder_path), constants.IN_WATCH_MASK)
+        if watch_descriptor < 0:
+            error_number = ctypes.get_errno()
+            logger.error(f"unable to watch {folder_path}, error: {os.strerror(error_number)}")  # ENOSPC means fs.inotify.max_user_watches is too low
+            return
+        self.watched_folders[watch_descriptor] = folder_path
+
+    def _unwatch_tree(self, folder_path: str):
+        """the moved folder is watched again using its new path if it is moved inside the library"""
+        for watch_descriptor, watched_folder in list(self.watched_folders.items()):
+            if watched_folder == folder_path or watched_folder.startswith(folder_path + os.sep):
+                self.libc.inotify_rm_watch(self.fd, watch_descriptor)
+                del self.watched_folders[watch_descriptor]
+
+
+class PollingWatcher(FolderWatcher):
+    def __init__(self, root_dir: str, ignore_patterns: list[str] | None = None, poll_interval: float = constants.POLL_INTERVAL_SECONDS):
+        super().__init__(root_dir, ignore_patterns)
+        self.poll_interval = poll_interval
+        self.folder_states = self._get_folder_states()
+        self.last_poll_time = time.monotonic()
+        logger.info(f"watching {len(self.folder_states)} folders in {root_dir} by polling every {poll_interval} seconds")
+
+    def read_changed_folders(self, timeout: float | None) -> list[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            next_poll_time = self.last_poll_time + self.poll_interval
+            if time.monotonic() >= next_poll_time:
+                changed_folders = self._poll()
+                if changed_folders:
+                    return changed_folders
+                next_poll_time = self.last_poll_time + self.poll_interval
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return []
+            time.sleep(max(0.0, min(next_poll_time, deadline) - now if deadline is not None else next_poll_time - now))
+
+    # private functions
+    def _poll(self) -> list[str]:
+        self.last_poll_time = time.monotonic()
+        return self._get_changed_folders()
+
+
+def get_folder_watcher(root_dir: str, ignore_patterns: list[str] | None = None, use_polling: bool = False) -> FolderWatcher:
+    """inotify watcher on linux, polling watcher otherwise (or if inotify is not available)"""
+    if not use_polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root_dir, ignore_patterns)
+        except OSError as e:
+            logger.error(f"unable to use inotify, falling back to polling, error:\n{e}")
+    return PollingWatcher(root_dir, ignore_patterns)
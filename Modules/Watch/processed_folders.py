@@ -0,0 +1,56 @@
+import os
+
+from Modules.Scan.audio_file_filter import has_supported_extension
+from Modules.Scan.walker import DirectoryNode, DirectoryWalker
+
+"""
+processing an album (tagging, renaming, downloading scans) changes the album folder, which is reported by the watcher again.
+the audio files of every processed album folder are remembered by (inode, size, mtime_ns), which survive renames and moves,
+so that a folder is processed again only if its audio files actually changed after it was processed
+"""
+
+
+class ProcessedFolders:
+    def __init__(self):
+        self.audio_files_of_folder: dict[str, frozenset[tuple[int, int, int]]] = {}
+        self.walker = DirectoryWalker()
+
+    def is_unchanged(self, folder_path: str) -> bool:
+        audio_files = self.audio_files_of_folder.get(folder_path)
+        return audio_files is not None and audio_files == self._get_audio_files(folder_path)
+
+    def record(self, folder_path: str, folder_inode: int):
+        """folder_inode is the inode of the folder before processing, used for finding the folder if it was renamed"""
+        current_folder_path = self._find_folder(folder_path, folder_inode)
+        if current_folder_path:
+            self.audio_files_of_folder[current_folder_path] = self._get_audio_files(current_folder_path)
+
+    # private functions
+    def _find_folder(self, folder_path: str, folder_inode: int) -> str | None:
+        if os.path.isdir(folder_path):
+            return folder_path
+        parent_folder = os.path.dirname(folder_path)
+        try:
+            with os.scandir(parent_folder) as iterator:
+                for entry in iterator:
+                    if entry.is_dir() and entry.inode() == folder_inode:
+                        return entry.path
+        except OSError:
+            pass
+        return None
+
+    def _get_audio_files(self, folder_path: str) -> frozenset[tuple[int, int, int]]:
+        audio_files: set[tuple[int, int, int]] = set()
+        stack: list[DirectoryNode] = [self.walker.walk(folder_path)]
+        while stack:
+            node = stack.pop()
+            for entry in node.entries:
+                if entry.path in node.subdirectories or not has_supported_extension(entry.name):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                audio_files.add((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+            stack.extend(node.get_subdirectories())
+        return frozenset(audio_files)
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.VGMDB.api.album_id_index import AlbumIdIndex, normalize_barcode, normalize_catalog
+from Modules.VGMDB.api.client import VgmdbClient
+from Modules.VGMDB.api.offline_mirror import OfflineMirror
+
+VGMDB_ALBUMS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testSamples", "vgmdbAlbums")
+
+
+class TestAlbumIdIndex(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.database_path = os.path.join(self.folder, "index.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_normalization(self):
+        self.assertEqual(normalize_catalog("KSLA-0076~8"), ["KSLA00768", "KSLA0076"])
+        self.assertEqual(normalize_catalog(" ksla 0076 "), ["KSLA0076"])
+        self.assertEqual(normalize_catalog("N/A"), [])
+        self.assertEqual(normalize_barcode("0 45496 83000 5"), ["45496830005"])  # UPC-A
+        self.assertEqual(normalize_barcode("0045496830005"), ["45496830005"])  # same barcode as EAN-13
+        self.assertEqual(normalize_barcode("1234"), [])
+
+    def test_find_album_id(self):
+        index = AlbumIdIndex(self.database_path)
+        index.add([("41676", "KSLA-0076~8", "4560372440767"), ("1", "SQEX-10001", None), ("2", "SQEX-10001", None)])
+        index.close()
+
+        index = AlbumIdIndex(self.database_path)  # persistent
+        self.assertEqual(index.find_album_id("KSLA-0076", None), "41676")
+        self.assertEqual(index.find_album_id(None, "4560372440767"), "41676")
+        self.assertEqual(index.find_album_id("KSLA-0076", "4560372440767"), "41676")
+        self.assertIsNone(index.find_album_id("SQEX-10001", None))  # ambiguous
+        self.assertEqual(index.find_album_id("KSLA-0076", "4988601460180"), "41676")  # barcode not known, catalog is enough
+        index.add([("551", None, "4988601460180")])
+        self.assertIsNone(index.find_album_id("KSLA-0076", "4988601460180"))  # catalog and barcode point to different albums
+        index.close()
+
+    @mock.patch("Modules.VGMDB.api.client.USE_LOCAL_SERVER", False)
+    def test_client_fills_index(self):
+        offline_mirror = OfflineMirror(os.path.join(self.folder, "mirror.sqlite3"))
+        offline_mirror.import_folder(VGMDB_ALBUMS_FOLDER)
+        client = VgmdbClient(offline_mirror=offline_mirror, album_id_index=AlbumIdIndex(self.database_path))
+        self.assertIsNone(client.find_album_id("PSCN-5001", None))
+        client.search_album("Rewrite")  # search results only have catalog numbers
+        self.assertEqual(client.find_album_id("KSLA-0076", None), "41676")
+        self.assertIsNone(client.find_album_id(None, "4988601460180"))
+        client.get_album_details("551")
+        self.assertEqual(client.find_album_id(None, "4988601460180"), "551")
+        offline_mirror.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
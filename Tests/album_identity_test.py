@@ -0,0 +1,55 @@
+import unittest
+
+# REMOVE
+import os
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Scan.album_identity import match_album_identity
+from Modules.Scan.models.track_tags import TrackTags
+
+
+def make_tags(**tags: object) -> TrackTags:
+    return TrackTags.model_validate(tags)
+
+
+class TestAlbumIdentity(unittest.TestCase):
+    def test_common_album_name(self):
+        tracks = [make_tags(album=["Rewrite OST", "リライト"], catalog=[f"KSLA-00{i}"]) for i in range(10)]
+        result = match_album_identity(tracks)
+        self.assertTrue(result.is_single_album)
+        self.assertEqual((result.matched_key, result.matched_value), ("album", "Rewrite OST"))
+
+    def test_vgmdb_link_has_priority(self):
+        tracks = [make_tags(album=["A"], vgmdb_link=["https://vgmdb.net/album/1"]), make_tags(album=["A"], vgmdb_link=["https://vgmdb.net/album/1"])]
+        self.assertEqual(match_album_identity(tracks).matched_key, "vgmdb_link")
+
+    def test_common_value_in_multi_valued_tags(self):
+        tracks = [make_tags(catalog=["KSLA-0001", "KSLA-0002"]), make_tags(catalog=["KSLA-0002"])]
+        result = match_album_identity(tracks)
+        self.assertEqual((result.matched_key, result.matched_value), ("catalog", "KSLA-0002"))
+
+    def test_full_date(self):
+        tracks = [make_tags(date="2010-06-25"), make_tags(date="2010-06-25")]
+        self.assertEqual(match_album_identity(tracks).matched_key, "date")
+        tracks = [make_tags(date="2010"), make_tags(date="2010")]
+        self.assertFalse(match_album_identity(tracks).is_single_album)
+
+    def test_split_between_albums(self):
+        tracks = [make_tags(album=["A"], catalog=["X-1"]), make_tags(album=["B"]), make_tags(album=["A"])]
+        result = match_album_identity(tracks)
+        self.assertFalse(result.is_single_album)
+        self.assertEqual(result.split_key, "album")
+        self.assertEqual(result.groups, {"A": [0, 2], "B": [1]})
+
+    def test_no_tracks_and_no_tags(self):
+        self.assertFalse(match_album_identity([]).is_single_album)
+        result = match_album_identity([make_tags(), make_tags()])
+        self.assertFalse(result.is_single_album)
+        self.assertEqual(result.groups, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
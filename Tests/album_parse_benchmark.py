@@ -0,0 +1,69 @@
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Utils import general_utils
+from Modules.VGMDB.models.vgmdb_album_data import VgmdbAlbumData
+from Tests.scan_benchmark import time_function
+
+"""
+micro benchmark for parsing vgmdb album responses, run from the root of the repository:
+    python Tests/album_parse_benchmark.py --tracks 500 --payload path/to/album.json
+a box set payload is built from the tracklist of --payload (a real vgmdb.info album response, or the fixture album by default),
+repeating its tracks till there are --tracks tracks spread over discs of 25 tracks. the json decoding and the VgmdbAlbumData construction are timed separately,
+with orjson (if installed) and with json
+"""
+
+DEFAULT_PAYLOAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testSamples", "vgmdbAlbums", "41676.json")
+TRACKS_PER_DISC = 25
+
+
+def build_box_set_payload(album: dict[str, Any], num_tracks: int) -> bytes:
+    tracks = [track for disc in album["discs"] for track in disc["tracks"]]
+    box_set_tracks = [tracks[index % len(tracks)] for index in range(num_tracks)]
+    album = {**album, "picture_full": None}  # no cover download in background
+    album["discs"] = [
+        {"name": f"Disc {disc_number + 1}", "disc_length": "", "tracks": box_set_tracks[start : start + TRACKS_PER_DISC]}
+        for disc_number, start in enumerate(range(0, num_tracks, TRACKS_PER_DISC))
+    ]
+    credits = album["composers"] + album["performers"] if album["composers"] + album["performers"] else [{"names": {"en": "Composer", "ja": "作曲家"}}]
+    album["performers"] = [credits[index % len(credits)] for index in range(num_tracks // 2)]  # box sets credit a lot of people
+    return json.dumps(album, ensure_ascii=False).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark parsing of big vgmdb album responses")
+    parser.add_argument("--tracks", type=int, default=500, help="number of tracks in the box set")
+    parser.add_argument("--payload", default=DEFAULT_PAYLOAD, help="vgmdb.info album json whose tracks are repeated")
+    parser.add_argument("--repeats", type=int, default=20, help="number of runs of every function, min and median are reported")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with open(args.payload, "r", encoding="utf-8") as payload_file:
+        payload = build_box_set_payload(json.load(payload_file), args.tracks)
+    decoders = {"orjson": general_utils.orjson, "json": None} if general_utils.orjson else {"json": None}
+    print(f"{args.tracks} tracks, {len(payload) / 1024:.1f} KB payload")
+    for decoder_name, decoder in decoders.items():
+        general_utils.orjson = decoder
+        album = general_utils.parse_json(payload)
+        timings = {
+            "parse_json": time_function(lambda: general_utils.parse_json(payload), args.repeats),
+            "VgmdbAlbumData": time_function(lambda: VgmdbAlbumData(**album, album_id="1"), args.repeats),
+            "total": time_function(lambda: VgmdbAlbumData(**general_utils.parse_json(payload), album_id="1"), args.repeats),
+        }
+        print(f"{decoder_name:>6}: " + ", ".join(f"{name}: {timing['median'] * 1000:.2f} ms (min {timing['min'] * 1000:.2f} ms)" for name, timing in timings.items()))
+
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+    main()
+    print(f"finished in {time.perf_counter() - start_time:.1f} seconds")
@@ -0,0 +1,61 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+import unittest
+from unittest import mock
+
+# REMOVE
+import os
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.VGMDB.api.async_client import AsyncVgmdbClient
+from Modules.VGMDB.api.client import VgmdbClient, VgmdbRequestException
+from Modules.VGMDB.api.rate_limiter import HostRateLimiter
+
+
+class TestAsyncVgmdbClient(unittest.TestCase):
+    @mock.patch("Modules.VGMDB.api.client.USE_LOCAL_SERVER", False)
+    def test_search_albums_concurrency_is_bounded(self):
+        client = VgmdbClient()
+        lock = threading.Lock()
+        in_flight = [0, 0]  # current, maximum
+        urls: list[str] = []
+
+        def get_request(url: str):
+            with lock:
+                urls.append(url)
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            if url.endswith("missing"):
+                return Exception("not found")
+            return {"results": {"albums": [{"catalog": url[-4:], "link": "album/1", "release_date": "2011", "titles": {"en": url}, "media_format": "CD", "category": "Game"}]}}
+
+        async_client = AsyncVgmdbClient(client, max_concurrency=3)
+        search_terms = [f"term {index:04}" for index in range(10)] + ["term 0000", "missing"]
+        with mock.patch.object(client, "get_request", side_effect=get_request):
+            results = asyncio.run(async_client.search_albums(search_terms))
+        async_client.close()
+
+        self.assertEqual(len(urls), 11)  # duplicate search term is fetched once
+        self.assertEqual(in_flight[1], 3)
+        self.assertIsInstance(results["missing"], VgmdbRequestException)
+        self.assertEqual(results["term 0007"][0].catalog, "0007")  # type: ignore
+        self.assertIs(client.search_album("term 0007"), results["term 0007"])  # results are cached by the wrapped client
+
+    def test_rate_limiter_spaces_requests_per_host(self):
+        rate_limiter = HostRateLimiter(20)
+        start = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            list(executor.map(rate_limiter.wait, ["https://vgmdb.info/album/1"] * 5 + ["https://media.vgm.io/cover.jpg"]))
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 20 - 0.01)  # 5 requests to vgmdb.info need 4 intervals
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+from unittest import mock
+
+# REMOVE
+import os
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.VGMDB.api.rate_limiter import HostRateLimiter
+from Modules.VGMDB.user_interface.cli_args import get_config_from_args
+
+
+def get_config(*cli_args: str, json_args: dict | None = None):
+    root_dir = tempfile.mkdtemp()  # configs are cached by root_dir
+    with mock.patch.object(sys, "argv", ["main.py", root_dir, *cli_args]), mock.patch("Modules.VGMDB.user_interface.cli_args._get_json_args", return_value=json_args if json_args else {}):
+        return get_config_from_args()
+
+
+class TestGetConfigFromArgs(unittest.TestCase):
+    def test_zero_values_are_kept(self):
+        self.assertEqual(get_config().prefetch_albums, 2)
+        self.assertEqual(get_config("--prefetch_albums", "0").prefetch_albums, 0)
+
+    def test_empty_strings_are_unset(self):
+        self.assertEqual(get_config(json_args={"backup_folder": ""}).backup_folder, "~/Music/Backups")
+
+    def test_limits_can_be_disabled(self):
+        config = get_config("--vgmdb_requests_per_second", "0", "--watch_debounce", "0")
+        self.assertEqual((config.vgmdb_requests_per_second, config.watch_debounce), (0, 0))
+        self.assertEqual(HostRateLimiter(config.vgmdb_requests_per_second).interval, 0)
+
+    def test_scan_ignore_patterns_can_be_emptied(self):
+        self.assertEqual(get_config().scan_ignore_patterns, ["Scans", "Logs"])
+        self.assertEqual(get_config("--scan_ignore_patterns").scan_ignore_patterns, [])
+        self.assertEqual(get_config(json_args={"scan_ignore_patterns": []}).scan_ignore_patterns, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
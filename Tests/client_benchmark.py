@@ -0,0 +1,88 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Utils.retry_policy import RetryPolicy
+from Modules.VGMDB.api.async_client import prefetch_album_details
+from Modules.VGMDB.api.client import VgmdbClient
+from Modules.VGMDB.api.record_replay import ReplayServer, save_fixture
+from Tests.scan_benchmark import time_function
+
+"""
+load test of the vgmdb client against the replay server (see Modules/VGMDB/api/record_replay.py), no network needed. run from the root of the repository:
+    python Tests/client_benchmark.py --albums 50 --latency 0.1 --error_rate 0.1
+--albums album details are fetched one after the other and with prefetch_album_details (for every --concurrency), a new client is used for every run so nothing is cached.
+the fixtures are the albums in Tests/testSamples/vgmdbAlbums repeated under new ids, a folder recorded with --record_dir can be given with --fixture_dir instead
+(its album ids are then taken from the recorded album/{id} responses). the error rate and seed make the injected errors reproducible
+"""
+
+DEFAULT_ALBUMS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testSamples", "vgmdbAlbums")
+
+
+def create_fixtures(fixture_dir: str, num_albums: int) -> list[str]:
+    album_files = sorted(os.listdir(DEFAULT_ALBUMS_FOLDER))
+    album_ids = [str(100000 + index) for index in range(num_albums)]
+    for index, album_id in enumerate(album_ids):
+        with open(os.path.join(DEFAULT_ALBUMS_FOLDER, album_files[index % len(album_files)]), "rb") as album_file:
+            save_fixture(fixture_dir, f"https://vgmdb.info/album/{album_id}", album_file.read())
+    return album_ids
+
+
+def get_recorded_album_ids(fixture_dir: str) -> list[str]:
+    album_folder = os.path.join(fixture_dir, "vgmdb.info")
+    return sorted(file_name.removeprefix("album%2F") for file_name in os.listdir(album_folder) if file_name.startswith("album%2F") and not file_name.endswith(".meta.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the vgmdb client against a local replay server")
+    parser.add_argument("--albums", type=int, default=50, help="number of albums fetched in every run")
+    parser.add_argument("--fixture_dir", help="folder recorded with --record_dir, synthetic fixtures are used by default")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds the replay server waits before answering")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="fraction of requests answered with a 503 error")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the injected errors")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[2, 4, 8], help="max concurrency values of prefetch_album_details")
+    parser.add_argument("--repeats", type=int, default=3, help="number of runs of every function, min and median are reported")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    fixture_dir = args.fixture_dir if args.fixture_dir else tempfile.mkdtemp()
+    album_ids = (get_recorded_album_ids(fixture_dir) if args.fixture_dir else create_fixtures(fixture_dir, args.albums))[: args.albums]
+    replay_server = ReplayServer(fixture_dir, args.latency, args.error_rate, seed=args.seed)
+    replay_server.start()
+    base_url = replay_server.get_url("https://vgmdb.info/")
+    retry_policy = RetryPolicy(max_attempts=5, base_delay=0.05, max_delay=0.5, max_retry_after=1)
+
+    def fetch_sequentially():
+        client = VgmdbClient(base_url=base_url, retry_policy=retry_policy)
+        for album_id in album_ids:
+            try:
+                client.get_album_details(album_id)
+            except Exception:
+                pass
+
+    timings = {"sequential": time_function(fetch_sequentially, args.repeats)}
+    for concurrency in args.concurrency:
+        timings[f"concurrency {concurrency}"] = time_function(lambda: prefetch_album_details(VgmdbClient(base_url=base_url, retry_policy=retry_policy), album_ids, concurrency), args.repeats)
+    print(f"{len(album_ids)} albums, {args.latency * 1000:.0f} ms latency, {args.error_rate:.0%} errors")
+    for name, timing in timings.items():
+        print(f"{name:>15}: {timing['median']:.2f} s (min {timing['min']:.2f} s), {len(album_ids) / timing['median']:.1f} albums/s")
+    print(f"replay server: {replay_server.pprint_statistics()}")
+    replay_server.stop()
+    if not args.fixture_dir:
+        shutil.rmtree(fixture_dir)
+
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+    main()
+    print(f"finished in {time.perf_counter() - start_time:.1f} seconds")
@@ -0,0 +1,69 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import wave
+from unigen import AudioFactory
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Scan.content_key import get_audio_content_key
+from Tests.test_utils import get_test_file_path
+
+
+def create_flac(file_path: str, md5: bytes, comment: bytes):
+    """minimal flac file containing STREAMINFO, a VORBIS_COMMENT block and some bytes in place of audio frames"""
+    stream_info = struct.pack(">HH", 4096, 4096) + bytes(6) + b"\x0a\xc4\x42\xf0" + bytes(4) + md5  # 44.1kHz, 2 channels, 16 bits
+    with open(file_path, "wb") as file:
+        file.write(b"fLaC")
+        file.write(bytes([0x00]) + len(stream_info).to_bytes(3, "big") + stream_info)
+        file.write(bytes([0x84]) + len(comment).to_bytes(3, "big") + comment)  # last block
+        file.write(b"\xff\xf8" + bytes(100))
+
+
+class TestContentKey(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_flac_uses_streaminfo_md5(self):
+        md5 = bytes(range(16))
+        create_flac(os.path.join(self.folder, "1.flac"), md5, b"album=A")
+        create_flac(os.path.join(self.folder, "2.flac"), md5, b"album=B, with a longer comment")
+        create_flac(os.path.join(self.folder, "3.flac"), bytes(16), b"album=A")
+        self.assertEqual(get_audio_content_key(os.path.join(self.folder, "1.flac")), f"flac:{md5.hex()}")
+        self.assertEqual(get_audio_content_key(os.path.join(self.folder, "2.flac")), f"flac:{md5.hex()}")
+        self.assertTrue(get_audio_content_key(os.path.join(self.folder, "3.flac")).startswith("flac-frames:"))  # type: ignore
+
+    def test_wav_hashes_data_chunk(self):
+        for file_name, frames in [("1.wav", b"\x01\x02" * 100), ("2.wav", b"\x01\x02" * 100), ("3.wav", b"\x03\x04" * 100)]:
+            with wave.open(os.path.join(self.folder, file_name), "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(44100)
+                wav_file.writeframes(frames)
+        keys = [get_audio_content_key(os.path.join(self.folder, file_name)) for file_name in ["1.wav", "2.wav", "3.wav"]]
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+
+    def test_tags_do_not_change_the_key(self):
+        for extension in ["mp3", "m4a", "ogg", "opus"]:
+            original_path, tagged_path = os.path.join(self.folder, f"1.{extension}"), os.path.join(self.folder, f"2.{extension}")
+            shutil.copy(get_test_file_path(extension, use_modified_folder=False), original_path)
+            shutil.copy(original_path, tagged_path)
+            audio_manager = AudioFactory.buildAudioManager(tagged_path)
+            audio_manager.setAlbum(["x" * 5000])  # larger than the padding, so the audio moves inside the file
+            audio_manager.save()
+            self.assertNotEqual(os.path.getsize(original_path), os.path.getsize(tagged_path))
+            self.assertEqual(get_audio_content_key(original_path), get_audio_content_key(tagged_path), extension)
+
+
+if __name__ == "__main__":
+    unittest.main()
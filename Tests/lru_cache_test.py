@@ -0,0 +1,43 @@
+import unittest
+
+# REMOVE
+import os
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Utils.lru_cache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    def test_entries_limit(self):
+        cache: LruCache[str, int] = LruCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # b is now the least recently used
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.peek("c"), 3)
+        self.assertEqual((len(cache), cache.hits, cache.misses, cache.evictions), (2, 1, 1, 1))
+
+    def test_size_limit(self):
+        cache: LruCache[str, bytes] = LruCache(max_entries=10, max_size_bytes=100, get_size=len)
+        cache.set("cover 1", bytes(40))
+        cache.set("cover 2", bytes(40))
+        cache.set("cover 1", bytes(50))  # replacing an entry updates the size
+        self.assertEqual(cache.size_bytes, 90)
+        cache.set("cover 3", bytes(30))
+        self.assertIsNone(cache.peek("cover 2"))
+        self.assertEqual(cache.size_bytes, 80)
+        cache.set("huge cover", bytes(101))
+        self.assertIsNone(cache.peek("huge cover"))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.pprint_statistics(), "2 entries, 0.0 MB, 0 hits, 0 misses, 1 evictions")
+
+        with self.assertRaises(ValueError):
+            LruCache(max_entries=10, max_size_bytes=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
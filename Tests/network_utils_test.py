@@ -0,0 +1,84 @@
+import os
+import requests
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Utils import network_utils
+from Modules.Utils.network_utils import HttpTransport, download_file
+from Modules.VGMDB.vgmdbrip import vgmdbrip
+
+FILE_DATA = os.urandom(200 * 1024)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections: set[int] = set()
+
+    def do_GET(self):
+        _Handler.connections.add(id(self.connection))
+        if self.path == "/missing.jpg":
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(FILE_DATA)))
+        self.end_headers()
+        self.wfile.write(FILE_DATA)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestNetworkUtils(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        _Handler.connections.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_connections_are_reused(self):
+        transport = HttpTransport()
+        for _ in range(5):
+            self.assertEqual(transport.get(f"{self.base_url}/cover.jpg").content, FILE_DATA)
+        transport.close()
+        self.assertEqual(len(_Handler.connections), 1)
+
+    def test_download_file(self):
+        file_path = download_file(f"{self.base_url}/scans/cover.jpg", self.folder, "Front")
+        self.assertEqual(os.path.basename(file_path), "Front.jpg")
+        with open(file_path, "rb") as file:
+            self.assertEqual(file.read(), FILE_DATA)
+
+        with self.assertRaises(requests.HTTPError):
+            download_file(f"{self.base_url}/missing.jpg", self.folder)
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "missing.jpg")))
+
+    def test_vgmdbrip_uses_configured_transport(self):
+        with mock.patch.object(network_utils, "_http_transport", HttpTransport(pool_maxsize=3)):  # like configure_http_transport after vgmdbrip is imported
+            vgmdbrip.mount_http_transport(vgmdbrip.session)
+            self.assertEqual(vgmdbrip.session.get_adapter("https://vgmdb.net/")._pool_maxsize, 3)  # type: ignore
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.VGMDB.api.client import VgmdbClient, VgmdbRequestException
+from Modules.VGMDB.api.offline_mirror import OfflineMirror
+
+VGMDB_ALBUMS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testSamples", "vgmdbAlbums")
+
+
+class TestOfflineMirror(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.offline_mirror = OfflineMirror(os.path.join(self.folder, "mirror.sqlite3"))
+        self.assertEqual(self.offline_mirror.import_folder(VGMDB_ALBUMS_FOLDER), 3)
+
+    def tearDown(self):
+        self.offline_mirror.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_search(self):
+        def search(search_term: str) -> list[str]:
+            return [result["link"] for result in self.offline_mirror.search(search_term)]
+
+        self.assertEqual(search("rewrite original"), ["album/41676"])
+        self.assertEqual(sorted(search("Rewrite")), ["album/19065", "album/41676"])
+        self.assertEqual(search("KSLA 0076"), ["album/41676"])  # catalog numbers are searched after cleaning
+        self.assertEqual(search("4988601460180"), ["album/551"])
+        self.assertEqual(search("ファイナルファンタジーVII"), ["album/551"])
+        self.assertEqual(search("final fant"), ["album/551"])  # prefix
+        self.assertEqual(search("Rewrite Nobuo"), [])
+
+        self.offline_mirror.import_album({"link": "album/41676", "name": "Rewrite OST (reissue)", "catalog": "KSLA-9999"})
+        self.assertEqual(search("KSLA 0076"), [])  # reimported albums are reindexed
+        self.assertEqual(self.offline_mirror.get_album_count(), 3)
+
+    def test_search_is_fast(self):
+        for album_id in range(1000, 3000):
+            self.offline_mirror.import_album({"link": f"album/{album_id}", "names": {"en": f"Generated Album {album_id}"}, "catalog": f"GEN-{album_id}"})
+        start = time.perf_counter()
+        for album_id in range(1000, 1100):
+            self.assertEqual(len(self.offline_mirror.search(f"GEN {album_id}")), 1)
+        self.assertLess((time.perf_counter() - start) / 100, 0.005)  # well under a millisecond on a desktop, relaxed for slow CI
+
+    @mock.patch("Modules.VGMDB.api.client.USE_LOCAL_SERVER", True)  # no server is started for the offline mirror
+    def test_client_uses_offline_mirror(self):
+        client = VgmdbClient(offline_mirror=self.offline_mirror)
+        with mock.patch.object(client, "get_request", side_effect=AssertionError("network should not be used")):
+            search_albums = client.search_album("Rewrite Original SoundTrack")
+            self.assertEqual([search_album.catalog for search_album in search_albums], ["KSLA-0076~8"])
+            vgmdb_album_data = client.get_album_details(search_albums[0].album_id)
+            self.assertEqual(vgmdb_album_data.total_tracks_in_album, 3)
+            self.assertEqual(vgmdb_album_data.names.japanese, ["Rewrite オリジナルサウンドトラック"])
+            with self.assertRaises(VgmdbRequestException):
+                client.get_album_details("1")
+
+    @mock.patch("Modules.VGMDB.api.client.USE_LOCAL_SERVER", True)
+    def test_offline_mirror_does_not_fetch_covers(self):
+        with open(os.path.join(VGMDB_ALBUMS_FOLDER, "41676.json")) as album_file:
+            album = json.load(album_file)
+        self.offline_mirror.import_album({**album, "link": "album/2000", "picture_full": "https://media.vgm.io/albums/00/2000/2000-1.jpg"})
+        client = VgmdbClient(offline_mirror=self.offline_mirror)
+        with mock.patch("Modules.VGMDB.models.vgmdb_album_data.get_raw_data_from_url", side_effect=AssertionError("network should not be used")) as get_raw_data_from_url:
+            vgmdb_album_data = client.get_album_details("2000")
+            self.assertIsNone(vgmdb_album_data.get_album_cover_data())
+        get_raw_data_from_url.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
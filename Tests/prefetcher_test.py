@@ -0,0 +1,90 @@
+import concurrent.futures
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# REMOVE
+import os
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Imports.config import Config
+from Modules.Scan.models.track_tags import TrackTags
+from Modules.Utils.general_utils import is_background_task
+from Modules.VGMDB.api.client import VgmdbClient
+from Modules.VGMDB.api.prefetcher import AlbumPrefetcher
+from Modules.VGMDB.models.search import SearchAlbum
+from Modules.VGMDB.user_interface.cli import CLI
+
+
+def make_search_album(album_id: str) -> SearchAlbum:
+    return SearchAlbum.model_validate({"catalog": "KSLA-0076", "link": f"album/{album_id}", "release_date": "2011-06-24", "titles": {"en": "Rewrite Original SoundTrack"}})
+
+
+class TestAlbumPrefetcher(unittest.TestCase):
+    def test_prefetch(self):
+        client = mock.Mock()
+        client.search_album.side_effect = lambda search_term: [make_search_album("41676")] if search_term == "KSLA-0076" else [make_search_album("1"), make_search_album("2")]
+        prefetcher = AlbumPrefetcher(client)
+        futures = [
+            prefetcher.prefetch("551", "ignored"),  # embedded album id
+            prefetcher.prefetch(None, "KSLA-0076"),  # single search result
+            prefetcher.prefetch(None, "Rewrite"),  # user has to choose
+        ]
+        concurrent.futures.wait(futures)
+        prefetcher.close()
+        self.assertEqual(sorted(call.args[0] for call in client.get_album_details.call_args_list), ["41676", "551"])
+        self.assertEqual(sorted(call.args[0] for call in client.search_album.call_args_list), ["KSLA-0076", "Rewrite"])
+
+        background_tasks: list[bool] = []
+        client.get_album_details.side_effect = lambda album_id: background_tasks.append(is_background_task())
+        prefetcher = AlbumPrefetcher(client)
+        prefetcher.prefetch("551", None).result()
+        prefetcher.close()
+        self.assertEqual(background_tasks, [True])  # messages of prefetching are logged at debug level
+
+        client.get_album_details.side_effect = Exception("vgmdb.info is down")
+        prefetcher = AlbumPrefetcher(client)
+        self.assertIsNone(prefetcher.prefetch("551", None).result())  # errors are left for the actual fetch to report
+        prefetcher.close()
+
+    @mock.patch("Modules.VGMDB.api.client.USE_LOCAL_SERVER", False)
+    def test_client_fetches_a_key_once_across_threads(self):
+        client = VgmdbClient()
+
+        def get_request(url: str):
+            time.sleep(0.05)
+            return {"results": {"albums": [make_search_album("41676").model_dump()]}}
+
+        with mock.patch.object(client, "get_request", side_effect=get_request) as mocked_get_request:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(client.search_album, ["Rewrite"] * 4))
+        self.assertEqual(mocked_get_request.call_count, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual((client.key_locks, client.key_lock_users), ({}, {}))  # locks do not outlive the fetches
+
+    @mock.patch("Modules.VGMDB.api.client.USE_LOCAL_SERVER", False)
+    def test_unattended_runs_stream_albums(self):
+        cli = CLI(Config(root_dir=tempfile.mkdtemp(), recur=True, no_input=True, response_cache=False, album_id_index=False, scan_cache=False, vgmdb_max_concurrency=4))
+        scanned_albums: list[str] = []
+
+        def scan_albums():
+            for album_id in range(1, 11):
+                scanned_albums.append(str(album_id))
+                album = mock.Mock(album_folder_name=f"Album {album_id}")
+                album.get_one_sample_track.return_value.scanned_tags = TrackTags(vgmdb_id=[str(album_id)])
+                yield album
+
+        prefetcher = mock.Mock()
+        albums = cli._look_ahead(scan_albums(), prefetcher)
+        self.assertEqual(next(albums).album_folder_name, "Album 1")
+        self.assertEqual(scanned_albums, [str(album_id) for album_id in range(1, 6)])  # not held back till a whole batch is scanned
+        self.assertEqual([call.args[0] for call in prefetcher.prefetch.call_args_list], scanned_albums)
+        self.assertEqual(len(list(albums)), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import http.client
+import io
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+from PIL import Image
+
+# REMOVE
+import os
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Utils.retry_policy import RetryPolicy
+from Modules.VGMDB.api.client import VgmdbClient
+from Modules.VGMDB.api.record_replay import ReplayServer, ResponseRecorder, get_fixture_path, save_fixture
+
+ALBUMS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testSamples", "vgmdbAlbums")
+
+
+def save_album_fixtures(fixture_dir: str):
+    with open(os.path.join(ALBUMS_FOLDER, "41676.json"), "rb") as album_file:
+        album = json.loads(album_file.read())
+    album["picture_full"] = "https://media.vgm.io/albums/76/41676/41676-1.jpg"
+    save_fixture(fixture_dir, "https://vgmdb.info/album/41676", json.dumps(album).encode())
+    cover = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(cover, format="JPEG")
+    save_fixture(fixture_dir, "https://media.vgm.io/albums/76/41676/41676-1.jpg", cover.getvalue(), content_type="image/jpeg")
+    search_result = {"results": {"albums": [{"link": "album/41676", "catalog": album["catalog"], "titles": album["names"], "release_date": "2011-07-06", "media_format": "CD"}]}}
+    save_fixture(fixture_dir, "https://vgmdb.info/search?q=Rewrite Original Soundtrack", json.dumps(search_result).encode())
+
+
+class TestRecordReplay(unittest.TestCase):
+    def setUp(self):
+        self.fixture_dir = tempfile.mkdtemp()
+        save_album_fixtures(self.fixture_dir)
+
+    def replay(self, **kwargs) -> ReplayServer:
+        replay_server = ReplayServer(self.fixture_dir, **kwargs)
+        replay_server.start()
+        self.addCleanup(replay_server.stop)
+        return replay_server
+
+    def test_replay_client(self):
+        replay_server = self.replay()
+        client = VgmdbClient(base_url=replay_server.get_url("https://vgmdb.info/"))
+        self.assertEqual(client.search_album("Rewrite Original Soundtrack")[0].album_id, "41676")
+        album = client.get_album_details("41676")
+        self.assertEqual(album.album_id, "41676")
+        self.assertEqual(album.picture_full, replay_server.get_url("https://media.vgm.io/albums/76/41676/41676-1.jpg"))
+        self.assertIsNotNone(album.get_album_cover_data())
+        self.assertEqual(requests.get(replay_server.get_url("https://vgmdb.info/album/1")).status_code, 404)
+        self.assertEqual(replay_server.missing_fixtures, 1)
+
+    def test_paths_outside_fixture_dir_are_rejected(self):
+        replay_server = self.replay()
+        for path in ["/../x", "/vgmdb.info/..", "/"]:
+            connection = http.client.HTTPConnection(*replay_server.server.server_address[:2])  # requests would normalize the dots away
+            connection.request("GET", path)
+            self.assertEqual(connection.getresponse().status, 400, path)
+            connection.close()
+        with self.assertRaises(ValueError):
+            get_fixture_path(self.fixture_dir, "https://../album/1")
+
+    @mock.patch("Modules.VGMDB.api.client.time.sleep")
+    def test_injected_errors(self, sleep: mock.Mock):
+        replay_server = self.replay(error_rate=1)
+        client = VgmdbClient(base_url=replay_server.get_url("https://vgmdb.info/"), retry_policy=RetryPolicy(3, 1, 1, 1))
+        result = client.get_request(replay_server.get_url("https://vgmdb.info/album/41676"))
+        self.assertIsInstance(result, requests.HTTPError)
+        self.assertEqual((replay_server.served_requests, replay_server.injected_errors), (3, 3))
+
+    def test_recorder(self):
+        replay_server = self.replay()
+        record_dir = tempfile.mkdtemp()
+        session = requests.Session()
+        recorder = ResponseRecorder(record_dir)
+        recorder.attach(session)
+        search_url = replay_server.get_url("https://vgmdb.info/search?q=Rewrite Original Soundtrack")
+        session.get(search_url)
+        self.assertEqual(recorder.recorded_responses, 1)
+        with open(get_fixture_path(record_dir, search_url), "rb") as recorded_file:
+            self.assertEqual(json.loads(recorded_file.read())["results"]["albums"][0]["link"], "album/41676")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.VGMDB.api.client import VgmdbClient
+from Modules.VGMDB.api.response_cache import ResponseCache
+
+SEARCH_RESPONSE = {
+    "results": {
+        "albums": [
+            {"catalog": "KSLA-0076", "link": "album/41676", "release_date": "2011-06-24", "titles": {"en": "Rewrite Original SoundTrack", "ja": "Rewrite オリジナルサウンドトラック"}, "media_format": "CD", "category": "Game"},
+        ]
+    }
+}
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.database_path = os.path.join(self.folder, "responses.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_entries_persist_and_expire(self):
+        cache = ResponseCache(self.database_path, ttl_seconds={"album": 60, "search": 0})
+        cache.set("album", "41676", {"name": "リライト"})
+        cache.set("search", "rewrite", [])
+        cache.close()
+
+        cache = ResponseCache(self.database_path, ttl_seconds={"album": 60, "search": 0})
+        self.assertEqual(cache.get("album", "41676"), {"name": "リライト"})
+        self.assertIsNone(cache.get("album", "551"))
+        with mock.patch("time.time", return_value=cache.connection.execute("SELECT MAX(created_at) FROM responses").fetchone()[0] + 1):
+            self.assertIsNone(cache.get("search", "rewrite"))
+        self.assertEqual(cache.pprint_statistics(), "album: 1 hits, 1 misses, search: 0 hits, 1 misses")
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResponseCache(self.database_path)
+        now = time.time()
+        for index, album_id in enumerate(["1", "2", "3"]):
+            with mock.patch("time.time", return_value=now + index):
+                cache.set("album", album_id, {"notes": os.urandom(1000).hex()})  # incompressible, so every entry is of the same size
+        with mock.patch("time.time", return_value=now + 3):
+            cache.get("album", "1")
+        cache.max_size_bytes = int(2.5 * cache.connection.execute("SELECT MAX(size) FROM responses").fetchone()[0])
+        with mock.patch("time.time", return_value=now + 4):
+            cache.set("album", "4", {"notes": os.urandom(1000).hex()})
+        self.assertEqual([album_id for album_id in ["1", "2", "3", "4"] if cache.get("album", album_id) is not None], ["1", "4"])
+
+    @mock.patch("Modules.VGMDB.api.client.USE_LOCAL_SERVER", False)
+    def test_client_uses_cached_responses(self):
+        for refresh, expected_requests in [(False, 1), (False, 0), (True, 1)]:
+            client = VgmdbClient(response_cache=ResponseCache(self.database_path), refresh=refresh)
+            with mock.patch.object(client, "get_request", return_value=SEARCH_RESPONSE) as get_request:
+                search_albums = client.search_album("Rewrite")
+            self.assertEqual(get_request.call_count, expected_requests)
+            self.assertEqual([album.catalog for album in search_albums], ["KSLA-0076"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import email.utils
+import json
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+# REMOVE
+import os
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Utils.network_utils import get_http_transport
+from Modules.Utils.retry_policy import CircuitBreaker, CircuitOpenException, RetryPolicy
+from Modules.VGMDB.api.client import VgmdbClient
+
+
+def make_response(status_code: int, json_data: dict | None = None, headers: dict[str, str] | None = None) -> mock.Mock:
+    return mock.Mock(status_code=status_code, reason="reason", headers=headers if headers else {}, content=json.dumps(json_data).encode())
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_delays(self):
+        policy = RetryPolicy(max_attempts=5, base_delay=1, max_delay=4, max_retry_after=60)
+        for attempt, max_delay in [(1, 1), (2, 2), (3, 4), (6, 4)]:
+            delays = [policy.get_delay(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= delay <= max_delay for delay in delays))
+            self.assertGreater(len(set(delays)), 1)  # jittered
+        self.assertEqual(policy.get_delay(1, "7"), 7)
+        self.assertEqual(policy.get_delay(1, "3600"), 60)
+        self.assertAlmostEqual(policy.get_delay(1, email.utils.formatdate(time.time() + 20, usegmt=True)), 20, delta=1.5)
+        self.assertLessEqual(policy.get_delay(1, "invalid"), 1)
+        self.assertFalse(policy.is_retryable_status(404))
+        self.assertTrue(policy.is_retryable_status(503))
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow_request())
+        with mock.patch("time.monotonic", return_value=time.monotonic() + 11):
+            self.assertTrue(breaker.allow_request())  # trial request
+            self.assertFalse(breaker.allow_request())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, "open")
+        with mock.patch("time.monotonic", return_value=time.monotonic() + 22):
+            self.assertTrue(breaker.allow_request())
+            breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+        breaker.record_failure()
+        breaker.record_failure()
+        with mock.patch("time.monotonic", return_value=time.monotonic() + 11):
+            self.assertTrue(breaker.allow_request())  # the trial never reports back
+        with mock.patch("time.monotonic", return_value=time.monotonic() + 22):
+            self.assertTrue(breaker.allow_request())  # another trial instead of staying half-open for good
+
+
+@mock.patch("Modules.VGMDB.api.client.USE_LOCAL_SERVER", False)
+@mock.patch("Modules.VGMDB.api.client.time.sleep")
+class TestGetRequest(unittest.TestCase):
+    def get_request(self, client: VgmdbClient, responses: list):
+        with mock.patch("Modules.Utils.network_utils.HttpTransport.get", side_effect=responses) as get:
+            return client.get_request("https://vgmdb.info/album/1"), get.call_count
+
+    def test_status_classification(self, sleep: mock.Mock):
+        client = VgmdbClient()
+        result, attempts = self.get_request(client, [make_response(404)])
+        self.assertIsInstance(result, requests.HTTPError)
+        self.assertEqual(attempts, 1)
+        sleep.assert_not_called()
+
+        result, attempts = self.get_request(client, [make_response(503, headers={"Retry-After": "2"}), requests.ConnectionError("reset"), make_response(200, {"name": "album"})])
+        self.assertEqual(result, {"name": "album"})
+        self.assertEqual(attempts, 3)
+        self.assertEqual(sleep.call_args_list[0].args[0], 2)
+
+    def test_circuit_breaker_fails_fast(self, sleep: mock.Mock):
+        client = VgmdbClient(retry_policy=RetryPolicy(3, 1, 1, 1), circuit_breaker=CircuitBreaker(failure_threshold=4, reset_timeout=60))
+        result, attempts = self.get_request(client, [make_response(500)] * 3)
+        self.assertIsInstance(result, requests.HTTPError)
+        self.assertEqual(attempts, 3)
+        result, attempts = self.get_request(client, [make_response(500)] * 3)
+        self.assertIsInstance(result, CircuitOpenException)
+        self.assertEqual(attempts, 1)  # circuit opened after the 4th failure
+        result, attempts = self.get_request(client, [])
+        self.assertIsInstance(result, CircuitOpenException)
+        self.assertEqual(attempts, 0)
+
+    def test_rate_limited_trial_closes_circuit(self, sleep: mock.Mock):
+        client = VgmdbClient(retry_policy=RetryPolicy(2, 1, 1, 1), circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=10))
+        self.get_request(client, [make_response(500)])
+        with mock.patch("time.monotonic", return_value=time.monotonic() + 11):
+            result, attempts = self.get_request(client, [make_response(429), make_response(200, {"name": "album"})])
+        self.assertEqual(result, {"name": "album"})
+        self.assertEqual(attempts, 2)
+        self.assertEqual(client.circuit_breaker.state, "closed")
+
+    def test_default_timeout_of_transport(self, sleep: mock.Mock):
+        with mock.patch("Modules.Utils.network_utils.HttpTransport.get", side_effect=[make_response(200, {})]) as get:
+            VgmdbClient().get_request("https://vgmdb.info/album/1")
+        self.assertEqual(get.call_args.kwargs["timeout"], get_http_transport().timeout)
+
+
+if __name__ == "__main__":
+    unittest.main()
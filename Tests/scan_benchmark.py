@@ -0,0 +1,143 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Scan.album_identity import match_album_identity
+from Modules.Scan.models.local_album_data import LocalTrackData
+from Modules.Scan.models.scanned_track import ScannedTrack
+from Modules.Scan.models.track_tags import TrackTags
+from Modules.Scan.scanner import Scanner
+from Tests.test_utils import create_synthetic_library
+
+"""
+benchmark for the scanner, run from the root of the repository:
+    python Tests/scan_benchmark.py --sizes 10x10 100x12 --output scan_benchmark.json
+    python Tests/scan_benchmark.py --sizes 10x10 100x12 --compare scan_benchmark.json
+a synthetic library (see test_utils.create_synthetic_library) is created for every size (albums x tracks per album) and the scanner functions are timed on it
+the results are written as json, giving the results of an older commit to --compare prints the change in every timing
+the time and memory of the per track records used while scanning are compared separately (--track_records)
+"""
+
+
+def time_function(function: Callable[[], Any], repeats: int) -> dict[str, float]:
+    timings: list[float] = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def benchmark_library(library_path: str, album_folders: list[str], repeats: int) -> dict[str, dict[str, float]]:
+    scanned_albums = {album_folder: [track.scanned_tags for track in Scanner().get_supported_audio_files_in_folder(album_folder)] for album_folder in album_folders}
+    return {
+        "scan_albums_recursively": time_function(lambda: Scanner().scan_albums_recursively(library_path), repeats),
+        "scan_albums_recursively_light": time_function(lambda: Scanner(light_scan=True).scan_albums_recursively(library_path), repeats),
+        "get_supported_audio_files_in_folder": time_function(lambda: Scanner().get_supported_audio_files_in_folder(library_path), repeats),
+        "album_detection": time_function(lambda: [match_album_identity(track_tags) for track_tags in scanned_albums.values()], repeats),
+    }
+
+
+def benchmark_track_records(num_tracks: int) -> dict[str, dict[str, float]]:
+    """time and memory (tracemalloc peak) of creating the per track records of a scan, the tags are shared so only the records themselves are measured"""
+    tags = TrackTags(album=["Album"], catalog=["KSLA-0001"], track_number=1, disc_number=1)
+    file_paths = [f"/music/Album {index // 20}/{index % 20:02d}. Track.flac" for index in range(num_tracks)]
+    record_factories: dict[str, Callable[[str], Any]] = {
+        "local_track_data": lambda file_path: LocalTrackData(file_path=file_path, depth_in_parent_folder=1, tags=tags),
+        "scanned_track": lambda file_path: ScannedTrack(file_path, 1, tags),
+    }
+    results: dict[str, dict[str, float]] = {}
+    for name, record_factory in record_factories.items():
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        records = [record_factory(file_path) for file_path in file_paths]
+        elapsed_time = time.perf_counter() - start_time
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {"seconds": elapsed_time, "peak_memory_mb": peak_memory / (1024 * 1024)}
+        del records
+    return results
+
+
+def get_git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(results: dict[str, Any], previous_results: dict[str, Any]):
+    previous_sizes = {result["size"]: result for result in previous_results["results"]}
+    print(f"comparing with {previous_results.get('commit')} ({previous_results.get('timestamp')})")
+    for result in results["results"]:
+        previous_result = previous_sizes.get(result["size"])
+        if not previous_result:
+            continue
+        for name, timing in result["timings"].items():
+            previous_timing = previous_result["timings"].get(name)
+            if not previous_timing:
+                continue
+            change = (timing["median"] - previous_timing["median"]) / previous_timing["median"] * 100
+            print(f"{result['size']:>10} {name:<40} {previous_timing['median'] * 1000:10.2f} ms -> {timing['median'] * 1000:10.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the scanner on synthetic libraries")
+    parser.add_argument("--sizes", nargs="+", default=["10x10", "50x12", "200x12"], help="library sizes as ALBUMSxTRACKS")
+    parser.add_argument("--repeats", type=int, default=5, help="number of runs of every function, min and median are reported")
+    parser.add_argument("--hard_link", action="store_true", help="hard link the tracks of an album instead of copying them, for huge libraries")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the random tags and folder layout")
+    parser.add_argument("--output", default="scan_benchmark.json", help="json file to write the results to")
+    parser.add_argument("--compare", help="json results of an earlier run to compare with")
+    parser.add_argument("--track_records", type=int, default=100000, help="number of tracks for comparing the memory and time of the track records, 0 to skip")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # the scanner logs every folder, which would end up in the timings
+
+    results: dict[str, Any] = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": get_git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [],
+    }
+    for size in args.sizes:
+        num_albums, tracks_per_album = (int(value) for value in size.lower().split("x"))
+        library_path = tempfile.mkdtemp(prefix="scan_benchmark_")
+        try:
+            album_folders = create_synthetic_library(library_path, num_albums, tracks_per_album, hard_link=args.hard_link, seed=args.seed)
+            timings = benchmark_library(library_path, album_folders, args.repeats)
+        finally:
+            shutil.rmtree(library_path, ignore_errors=True)
+        results["results"].append({"size": size, "albums": num_albums, "tracks_per_album": tracks_per_album, "timings": timings})
+        print(f"{size}: " + ", ".join(f"{name}: {timing['median'] * 1000:.2f} ms" for name, timing in timings.items()))
+
+    if args.track_records:
+        results["track_records"] = benchmark_track_records(args.track_records)
+        print(f"{args.track_records} track records: " + ", ".join(f"{name}: {result['seconds'] * 1000:.2f} ms, {result['peak_memory_mb']:.2f} MB" for name, result in results["track_records"].items()))
+
+    if args.compare:
+        with open(args.compare, "r") as previous_results_file:
+            compare_results(results, json.load(previous_results_file))
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from unigen import AudioFactory
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Scan.scan_cache import ScanCache
+from Modules.Scan.scanner import Scanner
+from Modules.Scan.walker import DirectoryNode, DirectoryWalker
+from Tests.test_utils import get_test_file_path
+
+
+def create_track(folder_path: str, file_name: str, album: str, track_number: int, disc_number: int = 1, extension: str = "mp3") -> str:
+    os.makedirs(folder_path, exist_ok=True)
+    file_path = os.path.join(folder_path, f"{file_name}.{extension}")
+    shutil.copy(get_test_file_path(extension, use_modified_folder=False), file_path)
+    audio_manager = AudioFactory.buildAudioManager(file_path)
+    audio_manager.setAlbum([album])
+    audio_manager.setTrackNumbers(track_number, 2)
+    audio_manager.setDiscNumbers(disc_number, 1)
+    audio_manager.save()
+    return file_path
+
+
+class TestScanner(unittest.TestCase):
+    def setUp(self):
+        self.library = tempfile.mkdtemp()
+        self.album_a = os.path.join(self.library, "Album A")
+        create_track(self.album_a, "01", "Album A", 1)
+        create_track(self.album_a, "02", "Album A", 2, extension="ogg")
+        with open(os.path.join(self.album_a, "cover.jpg"), "wb") as cover:
+            cover.write(b"not an image")
+        self.album_b = os.path.join(self.library, "Series", "Album B")
+        create_track(os.path.join(self.album_b, "Disc 1"), "01", "Album B", 1, disc_number=1)
+        create_track(os.path.join(self.album_b, "Disc 2"), "01", "Album B", 1, disc_number=2, extension="m4a")
+        os.makedirs(os.path.join(self.library, "Series", "Scans"))
+
+    def tearDown(self):
+        shutil.rmtree(self.library, ignore_errors=True)
+
+    def test_scan_albums_recursively(self):
+        albums = sorted(Scanner().scan_albums_recursively(self.library), key=lambda album: album.album_folder_path)
+        self.assertEqual([album.album_folder_path for album in albums], [self.album_a, self.album_b])
+        self.assertEqual(albums[0].total_tracks_in_album, 2)
+        self.assertEqual(sorted(albums[1].discs.keys()), [1, 2])
+
+    def test_every_directory_is_listed_once(self):
+        listed_directories: list[str] = []
+        original_scandir = os.scandir
+
+        def counting_scandir(path: str):
+            listed_directories.append(path)
+            return original_scandir(path)
+
+        with mock.patch("os.scandir", side_effect=counting_scandir):
+            Scanner().scan_albums_recursively(self.library)
+        self.assertEqual(len(listed_directories), len(set(listed_directories)))
+        self.assertEqual(len(listed_directories), 7)
+
+    def test_get_supported_audio_files_in_folder_max_depth(self):
+        self.assertEqual(len(Scanner().get_supported_audio_files_in_folder(self.album_b, max_depth=1)), 0)
+        self.assertEqual(len(Scanner().get_supported_audio_files_in_folder(self.album_b, max_depth=2)), 2)
+        self.assertEqual(len(Scanner().get_supported_audio_files_in_folder(self.library)), 4)
+
+    def test_parallel_reading_keeps_file_order(self):
+        sequential = [track.file_path for track in Scanner().get_supported_audio_files_in_folder(self.library)]
+        parallel = [track.file_path for track in Scanner(num_threads=4).get_supported_audio_files_in_folder(self.library)]
+        self.assertEqual(sequential, parallel)
+
+    def test_scan_cache_answers_unchanged_files(self):
+        scan_cache = ScanCache(os.path.join(self.library, "scan_cache.sqlite3"))
+        first_scan = Scanner(scan_cache=scan_cache).scan_albums_recursively(self.library)
+        with mock.patch("unigen.AudioFactory.buildAudioManager", side_effect=AssertionError("file should not be opened")):
+            second_scan = Scanner(scan_cache=scan_cache).scan_albums_recursively(self.library)
+        self.assertEqual([album.pprint() for album in first_scan], [album.pprint() for album in second_scan])
+        self.assertEqual(scan_cache.hits, 4)
+
+        modified_track = create_track(self.album_a, "01", "Album A", 1)
+        os.utime(modified_track, ns=(0, 0))
+        Scanner(scan_cache=scan_cache).scan_albums_recursively(self.library)
+        self.assertEqual(scan_cache.hits, 7)
+        scan_cache.close()
+
+    def test_non_audio_files_are_filtered_before_reading(self):
+        with open(os.path.join(self.album_a, "notes.mp3"), "w") as fake_audio_file:
+            fake_audio_file.write("not an mp3 file")
+        scanner = Scanner(verify_file_signatures=True)
+        with mock.patch("unigen.AudioFactory.buildAudioManager", wraps=AudioFactory.buildAudioManager) as build_audio_manager:
+            audio_files = scanner.get_supported_audio_files_in_folder(self.album_a)
+        self.assertEqual(len(audio_files), 2)
+        self.assertEqual(build_audio_manager.call_count, 2)
+        self.assertEqual(scanner.statistics.skipped_by_extension, 1)
+        self.assertEqual(scanner.statistics.skipped_by_signature, 1)
+
+    def test_scans_do_not_keep_audio_managers(self):
+        full_scan = Scanner().scan_albums_recursively(self.library)
+        light_scan = Scanner(light_scan=True).scan_albums_recursively(self.library)
+        self.assertEqual([album.pprint() for album in full_scan], [album.pprint() for album in light_scan])
+        tracks = [track for album in full_scan + light_scan for track in album.get_all_tracks()]
+        self.assertTrue(all(track.loaded_audio_manager is None for track in tracks))  # built when the album is operated on
+        self.assertEqual(tracks[0].audio_manager.getAlbum(), tracks[0].scanned_tags.album)
+
+    def test_mixed_folder_is_split_into_albums(self):
+        mixed_folder = os.path.join(self.library, "Mixed")
+        create_track(mixed_folder, "01", "Album C", 1)
+        create_track(mixed_folder, "02", "Album D", 1)
+        create_track(mixed_folder, "03", "Album C", 2)
+        self.assertIsNone(Scanner().scan_album_in_folder_if_exists(mixed_folder))
+        self.assertEqual(Scanner().scan_albums_in_folder(mixed_folder), [])
+        albums = Scanner(split_mixed_folders=True).scan_albums_in_folder(mixed_folder)
+        self.assertEqual(sorted((album.split_group, album.total_tracks_in_album) for album in albums), [("Album C", 2), ("Album D", 1)])
+        self.assertTrue(all(album.album_folder_path == mixed_folder for album in albums))
+        recursive_albums = Scanner(split_mixed_folders=True).scan_albums_recursively(self.library)
+        self.assertEqual(sorted(album.split_group or album.album_folder_name for album in recursive_albums), ["Album A", "Album B", "Album C", "Album D"])
+
+    def test_separated_album_folders_are_not_split(self):
+        series = os.path.join(self.library, "Other Series")
+        create_track(os.path.join(series, "Album X"), "01", "Album X", 1)
+        create_track(os.path.join(series, "Album X"), "02", "Album X", 2)
+        create_track(os.path.join(series, "Album Y"), "01", "Album Y", 1)
+        scanner = Scanner(split_mixed_folders=True)
+        albums = [album for album in scanner.scan_albums_recursively(self.library) if album.album_folder_path.startswith(series)]
+        expected = [(os.path.join(series, "Album X"), None, 2), (os.path.join(series, "Album Y"), None, 1)]
+        self.assertEqual(sorted((album.album_folder_path, album.split_group, album.total_tracks_in_album) for album in albums), expected)
+        changed_albums = scanner.scan_albums_containing_folder(os.path.join(series, "Album Y"), self.library)
+        self.assertEqual([(album.album_folder_path, album.split_group) for album in changed_albums], [(os.path.join(series, "Album Y"), None)])
+
+    def test_ignored_directories_are_never_listed(self):
+        create_track(os.path.join(self.library, "Series", "Scans", "Bonus"), "01", "Bonus", 1)
+        create_track(os.path.join(self.album_b, "Extras"), "01", "Extras", 1)
+        with open(os.path.join(self.library, "Series", ".taggerignore"), "w") as ignore_file:
+            ignore_file.write("# extras are not part of the album\nAlbum B/Extras\n")
+        listed_directories: list[str] = []
+        original_scandir = os.scandir
+
+        def counting_scandir(path: str):
+            listed_directories.append(path)
+            return original_scandir(path)
+
+        scanner = Scanner(ignore_patterns=["Scans"])
+        with mock.patch("os.scandir", side_effect=counting_scandir):
+            albums = scanner.scan_albums_recursively(self.library)
+        self.assertEqual(sorted(album.album_folder_path for album in albums), [self.album_a, self.album_b])
+        self.assertFalse(any("Scans" in path or "Extras" in path for path in listed_directories))
+        self.assertEqual(scanner.statistics.ignored_directories, 2)
+
+    def test_parallel_listing_gives_the_same_tree(self):
+        def flatten(node: DirectoryNode) -> list[tuple[str, int, list[str]]]:
+            flattened = [(node.path, node.max_depth_with_audio_files, [entry.name for entry in node.entries])]
+            for subdirectory in node.get_subdirectories():
+                flattened.extend(flatten(subdirectory))
+            return flattened
+
+        for max_depth in [-1, 1, 2]:
+            sequential_tree = DirectoryWalker(["Scans"]).walk(self.library, max_depth)
+            parallel_tree = DirectoryWalker(["Scans"], num_threads=4).walk(self.library, max_depth)
+            self.assertEqual(flatten(sequential_tree), flatten(parallel_tree))
+        albums = Scanner(listing_threads=4).scan_albums_recursively(self.library)
+        self.assertEqual(sorted(album.album_folder_path for album in albums), [self.album_a, self.album_b])
+
+    def test_find_duplicates(self):
+        album_a_copy = os.path.join(self.library, "Album A (copy)")
+        shutil.copytree(self.album_a, album_a_copy)
+        create_track(os.path.join(self.library, "Singles"), "01", "Single", 1, extension="m4a")
+        for file_name in ["01.mp3", "02.ogg"]:
+            audio_manager = AudioFactory.buildAudioManager(os.path.join(album_a_copy, file_name))
+            audio_manager.setAlbum(["Renamed Album A" * 500])
+            audio_manager.save()
+
+        report = Scanner().find_duplicates(self.library)
+        self.assertEqual(report.files_hashed, 7)
+        self.assertEqual([sorted(albums.album_folder_paths) for albums in report.duplicate_albums], [[self.album_a, album_a_copy]])
+        duplicate_files = sorted(sorted(os.path.relpath(file_path, self.library) for file_path in tracks.file_paths) for tracks in report.duplicate_tracks)
+        expected_duplicate_files = [  # every track of a format is a copy of the same sample
+            ["Album A (copy)/01.mp3", "Album A/01.mp3", "Series/Album B/Disc 1/01.mp3"],
+            ["Album A (copy)/02.ogg", "Album A/02.ogg"],
+            ["Series/Album B/Disc 2/01.m4a", "Singles/01.m4a"],
+        ]
+        self.assertEqual(duplicate_files, [[os.path.normpath(file_path) for file_path in tracks] for tracks in expected_duplicate_files])
+
+    def test_scan_albums_containing_folder(self):
+        scanner = Scanner()
+        albums = scanner.scan_albums_containing_folder(os.path.join(self.album_b, "Disc 2"), self.library)
+        self.assertEqual([album.album_folder_path for album in albums], [self.album_b])
+        self.assertEqual([album.album_folder_path for album in scanner.scan_albums_containing_folder(self.album_a, self.library)], [self.album_a])
+        self.assertEqual(scanner.scan_albums_containing_folder(os.path.join(self.library, "Series", "Scans"), self.library), [])
+        self.assertEqual(scanner.statistics.files_seen, 5)  # only the albums containing the folders were read
+
+
+if __name__ == "__main__":
+    unittest.main()
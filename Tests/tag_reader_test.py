@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+from mutagen.flac import FLAC, Picture
+from unigen import AudioFactory
+
+# REMOVE
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Scan.models.track_tags import TrackTags
+from Modules.Scan.tag_reader import _HeaderOnlyFlacWrapper, read_track_tags
+from Tests.content_key_test import create_flac
+
+PICTURE_SIZE = 4 * 1024 * 1024
+
+
+def create_flac_with_picture(file_path: str):
+    """minimal flac file (see content_key_test.create_flac) with a few tags and a large embedded front cover"""
+    create_flac(file_path, bytes(range(16)), bytes(8))  # empty vendor string and no comments
+    flac = FLAC(file_path)
+    flac["album"] = "Album A"
+    flac["catalog"] = "ABC-123"
+    flac["tracknumber"] = "1"
+    flac["discnumber"] = "1"
+    picture = Picture()
+    picture.type = 3
+    picture.mime = "image/jpeg"
+    picture.desc = "Front Cover"
+    picture.width, picture.height, picture.depth = 1000, 1000, 24
+    picture.data = b"\xff" * PICTURE_SIZE
+    flac.add_picture(picture)
+    flac.save()
+
+
+class TestTagReader(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.folder, "01.flac")
+        create_flac_with_picture(self.file_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_flac_tags_match_the_audio_manager(self):
+        tags = read_track_tags(self.file_path)
+        self.assertEqual(tags, TrackTags.from_audio_manager(AudioFactory.buildAudioManager(self.file_path)))
+        self.assertEqual((tags.album, tags.catalog, tags.track_number), (["Album A"], ["ABC-123"], 1))
+
+    def test_flac_picture_data_is_not_loaded(self):
+        self.assertEqual(len(FLAC(self.file_path).pictures[0].data), PICTURE_SIZE)
+        audio_manager = _HeaderOnlyFlacWrapper(self.file_path)
+        (picture,) = audio_manager.audio.pictures
+        self.assertEqual((picture.type, picture.mime, picture.desc, picture.width, picture.height), (3, "image/jpeg", "Front Cover", 1000, 1000))
+        self.assertEqual(picture.data, b"")
+        with self.assertRaises(PermissionError):
+            audio_manager.save()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@ import random
 import shutil
 import string
 from typing import Any
+from unigen import AudioFactory
 
 currentFileAbsolutePath = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 baseFolder = os.path.join(currentFileAbsolutePath, "testSamples", "baseSamples")
@@ -92,3 +93,63 @@ def save_image(image_bytes: bytes, filename: str):
         print(f"Image saved as {filename}.")
     except Exception as e:
         print(f"Error saving image: {e}")
+
+
+def get_available_sample_extensions() -> list[str]:
+    return [extension for extension in supported_extensions if os.path.exists(get_test_file_path(extension, use_modified_folder=False))]
+
+
+def create_synthetic_library(library_path: str, num_albums: int, tracks_per_album: int, hard_link: bool = False, seed: int | None = None) -> list[str]:
+    """
+    creates num_albums album folders containing tracks_per_album tracks each inside library_path, using the base samples with random tags
+    some albums are split into disc folders, and Scans/Logs folders (without audio files) are added as noise like in a real library
+    with hard_link, every track of an album is a hard link to one tagged file of that album (so all of them share the track number as well), which makes huge libraries cheap to create
+    returns the album folder paths
+    """
+    if seed is not None:
+        random.seed(seed)
+    extensions = get_available_sample_extensions()
+    album_folders: list[str] = []
+    for album_index in range(num_albums):
+        extension = random.choice(extensions)
+        album_name = f"{generate_random_japanese_string(3, 10) if random.randint(0, 1) else generate_random_string(5, 20)} {album_index}"
+        catalog = f"{''.join(random.choice(string.ascii_uppercase) for _ in range(4))}-{random.randint(1, 99999):05d}"
+        date = f"{random.randint(1980, 2024)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+        album_folder = os.path.join(library_path, f"Series {album_index % 10}", f"[{date}] Album {album_index}")
+        total_discs = 2 if tracks_per_album > 1 and random.random() < 0.3 else 1
+        tracks_per_disc = -(-tracks_per_album // total_discs)
+
+        template_path: str | None = None
+        for track_index in range(tracks_per_album):
+            disc_number, track_number = track_index // tracks_per_disc + 1, track_index % tracks_per_disc + 1
+            disc_folder = os.path.join(album_folder, f"Disc {disc_number}") if total_discs > 1 else album_folder
+            os.makedirs(disc_folder, exist_ok=True)
+            track_path = os.path.join(disc_folder, f"{track_number:02d}. {generate_random_string(5, 15)}.{extension}")
+            if hard_link and template_path:
+                os.link(template_path, track_path)
+                continue
+            shutil.copy(get_test_file_path(extension, use_modified_folder=False), track_path)
+            audio_manager = AudioFactory.buildAudioManager(track_path)
+            audio_manager.setAlbum([album_name])
+            audio_manager.setCatalog([catalog])
+            audio_manager.setDate(date)
+            audio_manager.setTrackNumbers(track_number, tracks_per_disc)
+            audio_manager.setDiscNumbers(disc_number, total_discs)
+            audio_manager.save()
+            template_path = track_path
+
+        shutil.copy(random.choice(covers), os.path.join(album_folder, "cover.jpg"))
+        if random.random() < 0.5:
+            scans_folder = os.path.join(album_folder, "Scans")
+            os.makedirs(scans_folder, exist_ok=True)
+            for scan_index in range(random.randint(1, 5)):
+                shutil.copy(random.choice(covers), os.path.join(scans_folder, f"scan_{scan_index:02d}.jpg"))
+        if random.random() < 0.5:
+            logs_folder = os.path.join(album_folder, "Logs")
+            os.makedirs(logs_folder, exist_ok=True)
+            with open(os.path.join(logs_folder, "extraction.log"), "w") as log_file:
+                log_file.write(generate_random_string(100, 1000))
+            with open(os.path.join(logs_folder, "album.cue"), "w") as cue_file:
+                cue_file.write(f'TITLE "{album_name}"\n')
+        album_folders.append(album_folder)
+    return album_folders
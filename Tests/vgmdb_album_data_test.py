@@ -0,0 +1,32 @@
+import unittest
+
+# REMOVE
+import os
+import sys
+
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Modules.Utils.general_utils import parse_json
+from Modules.VGMDB.models.vgmdb_album_data import Names, VgmdbTrackData
+
+
+class TestNames(unittest.TestCase):
+    def test_languages(self):
+        names = Names(**{"English": "Rewrite", "ja": "リライト", "Romaji": "Raito", "English (alternate)": "Re:write", "Chinese": "改写", "Korean": "None"})
+        self.assertEqual(names.english, ["Rewrite", "Re:write"])
+        self.assertEqual(names.japanese, ["リライト"])
+        self.assertEqual(names.romaji, ["Raito"])
+        self.assertEqual(names.others, ["改写"])
+
+        names.add_names(["Rewrite (translated)"], "translated")  # language_map shares its lists with the fields
+        self.assertEqual(names.translated, ["Rewrite (translated)"])
+        self.assertEqual(names.get_highest_priority_name(["translated", "english"]), "Rewrite (translated)")
+
+        copied_names = Names(**names.model_dump())
+        self.assertEqual(copied_names.english, names.english)
+        self.assertEqual(VgmdbTrackData.model_validate(parse_json(b'{"names": {"English": "Philosophyz"}}')).names.english, ["Philosophyz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# REMOVE
+sys.path.append(os.getcwd())
+# REMOVE
+
+from Imports.config import Config
+from Modules.VGMDB.user_interface.cli import CLI
+from Modules.Watch import constants
+from Modules.Watch.debouncer import FolderDebouncer
+from Modules.Watch.folder_watcher import FolderWatcher, InotifyWatcher, PollingWatcher
+from Modules.Watch.processed_folders import ProcessedFolders
+from Tests import scanner_test
+from Tests.test_utils import get_test_file_path
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.library = tempfile.mkdtemp()
+        self.album = os.path.join(self.library, "Album")
+        os.makedirs(os.path.join(self.album, "Disc 1"))
+        os.makedirs(os.path.join(self.library, "Album", "Scans"))
+
+    def tearDown(self):
+        shutil.rmtree(self.library, ignore_errors=True)
+
+    def add_track(self, folder_path: str, file_name: str = "01.mp3") -> str:
+        file_path = os.path.join(folder_path, file_name)
+        shutil.copy(get_test_file_path("mp3", use_modified_folder=False), file_path)
+        return file_path
+
+    def test_debouncer_waits_for_changes_to_settle(self):
+        debouncer = FolderDebouncer(5)
+        debouncer.add("/a", now=0)
+        debouncer.add("/b", now=3)
+        debouncer.add("/a", now=4)
+        self.assertEqual(debouncer.get_timeout(now=4), 4)
+        self.assertEqual(debouncer.pop_ready(now=8), ["/b"])
+        self.assertEqual(debouncer.pop_ready(now=8.5), [])
+        self.assertEqual(debouncer.pop_ready(now=9), ["/a"])
+        self.assertIsNone(debouncer.get_timeout(now=9))
+
+    def test_watchers_must_read_changed_folders(self):
+        class IncompleteWatcher(FolderWatcher):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteWatcher(self.library)  # type: ignore
+
+    def test_polling_watcher(self):
+        watcher = PollingWatcher(self.library, ["Scans"], poll_interval=0)
+        self.assertEqual(watcher.read_changed_folders(0), [])
+        self.add_track(os.path.join(self.album, "Disc 1"))
+        self.add_track(os.path.join(self.album, "Scans"))
+        self.assertEqual(watcher.read_changed_folders(1), [os.path.join(self.album, "Disc 1")])
+        shutil.rmtree(os.path.join(self.album, "Disc 1"))
+        self.assertEqual(watcher.read_changed_folders(1), [self.album])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is only available on linux")
+    def test_inotify_watcher(self):
+        watcher = InotifyWatcher(self.library, ["Scans"])
+        try:
+            self.assertEqual(watcher.read_changed_folders(0), [])
+            self.add_track(os.path.join(self.album, "Disc 1"))
+            self.add_track(os.path.join(self.album, "Scans"))
+            self.assertEqual(watcher.read_changed_folders(1), [os.path.join(self.album, "Disc 1")])
+            new_album = tempfile.mkdtemp(dir=self.library)
+            self.assertEqual(watcher.read_changed_folders(1), [new_album])
+            self.add_track(new_album)  # the new folder is watched as well
+            self.assertEqual(watcher.read_changed_folders(1), [new_album])
+        finally:
+            watcher.close()
+
+    def test_processed_folders_follow_renames(self):
+        track_path = self.add_track(os.path.join(self.album, "Disc 1"))
+        processed_folders = ProcessedFolders()
+        folder_inode = os.stat(self.album).st_ino
+        renamed_album = os.path.join(self.library, "[2010] Album")
+        os.rename(self.album, renamed_album)  # like organizing does
+        processed_folders.record(self.album, folder_inode)
+        self.assertTrue(processed_folders.is_unchanged(renamed_album))
+        self.add_track(os.path.join(renamed_album, "Scans"), "scan.jpg")
+        self.assertTrue(processed_folders.is_unchanged(renamed_album))
+        self.add_track(os.path.join(renamed_album, "Disc 1"), "02.mp3")
+        self.assertFalse(processed_folders.is_unchanged(renamed_album))
+        self.assertFalse(processed_folders.is_unchanged(os.path.dirname(track_path)))
+
+    def test_root_changes_only_scan_what_changed(self):
+        scanner_test.create_track(os.path.join(self.album, "Disc 1"), "01", "Album", 1)
+        new_album = os.path.join(self.library, "New Album")
+        scanner_test.create_track(new_album, "01", "New Album", 1)
+        watcher = mock.Mock()
+        watcher.read_changed_folders.side_effect = [[self.library, new_album], KeyboardInterrupt]  # like a folder moved into the library
+        cli = CLI(Config(root_dir=self.library, tag=False, organize=False, scan_cache=False, watch_debounce=0))
+        with mock.patch("Modules.VGMDB.user_interface.cli.get_folder_watcher", return_value=watcher), mock.patch.object(cli, "_operate_on_album") as operate_on_album:
+            cli.watch()
+        self.assertEqual([call.args[0].album_folder_path for call in operate_on_album.call_args_list], [new_album])  # the existing album is left alone
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is only available on linux")
+    def test_inotify_overflow_reports_only_changed_folders(self):
+        other_album = os.path.join(self.library, "Other Album")
+        os.makedirs(other_album)
+        self.add_track(other_album)
+        watcher = InotifyWatcher(self.library, ["Scans"])
+        try:
+            self.add_track(os.path.join(self.album, "Disc 1"))
+            overflow_event = struct.pack("iIII", -1, constants.IN_Q_OVERFLOW, 0, 0)
+            with mock.patch("os.read", side_effect=[overflow_event, BlockingIOError]):  # the queued events were dropped by the kernel
+                changed_folders = watcher.read_changed_folders(1)
+            self.assertEqual(changed_folders, [os.path.join(self.album, "Disc 1")])
+            self.assertEqual(watcher.overflows, 1)
+        finally:
+            watcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()